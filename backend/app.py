@@ -1,19 +1,34 @@
 import os
+import errno
+import json
+import base64
+import heapq
 import logging
 import shutil
 import threading
 import time
-from datetime import datetime, timedelta
-from flask import Flask, jsonify, request, send_from_directory
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func, desc, case
+from sqlalchemy import func, desc, case, select, event, tuple_, insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
 from pathlib import Path
-from functools import wraps
+from functools import wraps, lru_cache, partial
 import schedule
 import sqlite3
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add simple caching
 cache = {}
 CACHE_DURATION = 300  # 5 minutes
@@ -39,6 +54,11 @@ def cache_result(duration=CACHE_DURATION):
         return wrapper
     return decorator
 
+def is_database_locked(error):
+    """Check for SQLite's 'database is locked' via the driver error, without stringifying the wrapper"""
+    orig = getattr(error, 'orig', error)
+    return isinstance(orig, sqlite3.OperationalError) and bool(orig.args) and 'database is locked' in orig.args[0]
+
 def retry_on_db_lock(max_retries=3, delay=1):
     """Decorator to retry database operations on lock errors"""
     def decorator(func):
@@ -49,7 +69,7 @@ def retry_on_db_lock(max_retries=3, delay=1):
                 try:
                     return func(*args, **kwargs)
                 except OperationalError as e:
-                    if "database is locked" in str(e).lower():
+                    if is_database_locked(e):
                         last_exception = e
                         if attempt < max_retries - 1:
                             logger.warning(f"Database locked, retrying in {delay}s (attempt {attempt + 1}/{max_retries})")
@@ -97,28 +117,83 @@ app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
 }
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
 
+# Environment-derived settings, read once at import instead of on every request
+DEFAULT_DATA_PATH = os.environ.get('DATA_PATH', '/data')
+DEFAULT_SCAN_TIME = os.environ.get('SCAN_TIME', '01:00')
+
+class IsoJSONProvider(DefaultJSONProvider):
+    """JSON provider that writes dates and datetimes as ISO 8601, so row dicts can carry them unformatted"""
+    @staticmethod
+    def default(o):
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+class OrjsonProvider(IsoJSONProvider):
+    """JSON provider that serializes with orjson, falling back to default() for other types"""
+    # Keep Flask's output: sorted keys and non-string keys allowed; orjson writes naive datetimes
+    # natively in the same form as isoformat()
+    option = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS) if orjson else 0
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option), mimetype=self.mimetype
+        )
+
+# Every jsonify() goes through app.json - serialize with orjson when it is installed
+app.json = OrjsonProvider(app) if orjson is not None else IsoJSONProvider(app)
+
 # Initialize extensions
 db = SQLAlchemy(app)
 CORS(app)
 
+@app.after_request
+def add_conditional_headers(response):
+    """Tag API GET responses with an ETag so unchanged data comes back as 304 Not Modified"""
+    if (request.method == 'GET' and request.path.startswith('/api/') and response.status_code == 200
+            and response.mimetype == 'application/json' and not response.is_streamed):
+        # Let browsers keep the body but revalidate it on every use - a 304 makes that cheap,
+        # and a scan can finish at any moment, so not even analytics get a max-age
+        response.cache_control.no_cache = True
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+@event.listens_for(Engine, "connect")
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """Enforce FOREIGN KEYs (and ON DELETE CASCADE) - SQLite leaves them off per connection by default"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA foreign_keys=ON')
+        cursor.close()
+
 # Enable SQLite WAL mode for better concurrency
 def check_stuck_scans_on_startup():
     """Check for scans that are still marked as running and mark them as failed"""
     try:
         logger.info("Checking for stuck scans from previous sessions...")
         
-        # Find any scans still marked as 'running'
-        stuck_scans = ScanRecord.query.filter(ScanRecord.status == 'running').all()
+        # Find any scans still marked as 'running' - only the columns needed for logging
+        stuck_scans = ScanRecord.query.with_entities(
+            ScanRecord.id,
+            ScanRecord.start_time
+        ).filter(ScanRecord.status == 'running').all()
         
         if stuck_scans:
             logger.warning(f"Found {len(stuck_scans)} stuck scans from previous sessions")
             
             for scan in stuck_scans:
                 logger.warning(f"Marking stuck scan {scan.id} as failed (started: {scan.start_time})")
-                scan.status = 'failed'
-                scan.end_time = datetime.now()
-                scan.error_message = 'Scan was interrupted by container restart'
-                
+            
+            ScanRecord.query.filter(ScanRecord.status == 'running').update({
+                'status': 'failed',
+                'end_time': datetime.now(),
+                'error_message': 'Scan was interrupted by container restart'
+            }, synchronize_session=False)
             db.session.commit()
             logger.info(f"Marked {len(stuck_scans)} stuck scans as failed")
         else:
@@ -174,6 +249,14 @@ scanner_state = {
 # Global scanner instance for stop functionality
 current_scanner_instance = None
 
+# Manual scan starts: the lock makes "check not scanning, then start" atomic across request threads,
+# and at most one scan may be started per SCAN_START_INTERVAL seconds. The limit is global on purpose -
+# behind the Docker gateway or a reverse proxy request.remote_addr is the same for every user anyway.
+# last_scan_start is the monotonic time of the last scan that actually started; a stop clears it
+scan_start_lock = threading.Lock()
+SCAN_START_INTERVAL = 60
+last_scan_start = None
+
 # Scheduled scan functionality
 def run_scheduled_scan():
     """Run a scheduled scan"""
@@ -187,7 +270,7 @@ def run_scheduled_scan():
             return
         
         # Get scan settings
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         max_duration = int(get_setting('max_scan_duration', '6'))
         logger.info(f"Scan settings - Data path: {data_path}, Max duration: {max_duration} hours")
         
@@ -262,7 +345,7 @@ class FileRecord(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     path = db.Column(db.String(2000), nullable=False)
     name = db.Column(db.String(500), nullable=False)
-    size = db.Column(db.Integer, nullable=False)  # Size in bytes
+    size = db.Column(db.BigInteger, nullable=False)  # Size in bytes
     is_directory = db.Column(db.Boolean, default=False)
     parent_path = db.Column(db.String(2000))
     extension = db.Column(db.String(50))
@@ -270,7 +353,7 @@ class FileRecord(db.Model):
     modified_time = db.Column(db.DateTime)
     accessed_time = db.Column(db.DateTime)
     permissions = db.Column(db.String(20))
-    scan_id = db.Column(db.Integer)
+    scan_id = db.Column(db.Integer, db.ForeignKey('scans.id', ondelete='CASCADE'))
 
 class ScanRecord(db.Model):
     """Model for storing scan sessions"""
@@ -281,7 +364,7 @@ class ScanRecord(db.Model):
     end_time = db.Column(db.DateTime)
     total_files = db.Column(db.Integer, default=0)
     total_directories = db.Column(db.Integer, default=0)
-    total_size = db.Column(db.Integer, default=0)  # Total size in bytes
+    total_size = db.Column(db.BigInteger, default=0)  # Total size in bytes
     status = db.Column(db.String(20), default='running')  # running, completed, failed
     error_message = db.Column(db.Text)
 
@@ -290,7 +373,7 @@ class MediaFile(db.Model):
     __tablename__ = 'media_files'
     
     id = db.Column(db.Integer, primary_key=True)
-    file_id = db.Column(db.Integer)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id', ondelete='CASCADE'))
     media_type = db.Column(db.String(20))  # movie, tv_show, music, other
     title = db.Column(db.String(500))
     year = db.Column(db.Integer)
@@ -302,9 +385,14 @@ class MediaFile(db.Model):
     audio_codec = db.Column(db.String(50))
     audio_channels = db.Column(db.String(20))
     runtime = db.Column(db.Integer)  # Runtime in minutes
-    bitrate = db.Column(db.Integer)
+    bitrate = db.Column(db.BigInteger)
     frame_rate = db.Column(db.Float)
     file_format = db.Column(db.String(20))
+    
+    # file_id backs the ON DELETE CASCADE from files - without it every deleted file scans media_files
+    __table_args__ = (
+        db.Index('idx_media_files_file_id', 'file_id'),
+    )
 
 class DuplicateGroup(db.Model):
     """Model for storing duplicate file groups"""
@@ -312,7 +400,7 @@ class DuplicateGroup(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     hash_value = db.Column(db.String(64), nullable=False)
-    size = db.Column(db.Integer, nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
     file_count = db.Column(db.Integer, default=0)
     created_time = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -321,11 +409,17 @@ class DuplicateFile(db.Model):
     __tablename__ = 'duplicate_files'
     
     id = db.Column(db.Integer, primary_key=True)
-    file_id = db.Column(db.Integer)
-    group_id = db.Column(db.Integer)
+    file_id = db.Column(db.Integer, db.ForeignKey('files.id', ondelete='CASCADE'))
+    group_id = db.Column(db.Integer, db.ForeignKey('duplicate_groups.id', ondelete='CASCADE'))
     hash_value = db.Column(db.String(64), nullable=False)
     is_primary = db.Column(db.Boolean, default=False)  # Marked as keep
     is_deleted = db.Column(db.Boolean, default=False)
+    
+    # Both foreign keys cascade on delete - index them so a deleted file or group isn't a full table scan
+    __table_args__ = (
+        db.Index('idx_duplicate_files_file_id', 'file_id'),
+        db.Index('idx_duplicate_files_group_id', 'group_id'),
+    )
 
 class StorageHistory(db.Model):
     """Model for storing storage usage over time"""
@@ -333,7 +427,7 @@ class StorageHistory(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.DateTime, nullable=False)
-    total_size = db.Column(db.Integer, nullable=False)  # Total size in bytes
+    total_size = db.Column(db.BigInteger, nullable=False)  # Total size in bytes
     file_count = db.Column(db.Integer, default=0)
     directory_count = db.Column(db.Integer, default=0)
 
@@ -352,11 +446,26 @@ class TrashBin(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     original_path = db.Column(db.String(2000), nullable=False)
-    original_size = db.Column(db.Integer, nullable=False)
+    original_size = db.Column(db.BigInteger, nullable=False)
     deleted_time = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime)  # When the file will be permanently deleted
     restored = db.Column(db.Boolean, default=False)
 
+class ScanStatistics(db.Model):
+    """Model for storing per-scan aggregates (by extension and by media type), written once when a scan completes"""
+    __tablename__ = 'scan_statistics'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    scan_id = db.Column(db.Integer, db.ForeignKey('scans.id', ondelete='CASCADE'), nullable=False)
+    stat_type = db.Column(db.String(20), nullable=False)  # extension, media_type
+    key = db.Column(db.String(50))  # The extension or media type
+    count = db.Column(db.Integer, default=0)
+    total_size = db.Column(db.BigInteger, default=0)
+    
+    __table_args__ = (
+        db.Index('idx_scan_statistics_scan', 'scan_id', 'stat_type', 'total_size'),
+    )
+
 # Replace the DirectoryTotal model with a more comprehensive FolderInfo model
 class FolderInfo(db.Model):
     """Model for storing comprehensive folder information"""
@@ -366,13 +475,13 @@ class FolderInfo(db.Model):
     path = db.Column(db.String(2000), nullable=False)
     name = db.Column(db.String(500), nullable=False)
     parent_path = db.Column(db.String(2000))
-    total_size = db.Column(db.Integer, default=0)  # Total size in bytes (including subdirectories)
+    total_size = db.Column(db.BigInteger, default=0)  # Total size in bytes (including subdirectories)
     file_count = db.Column(db.Integer, default=0)  # Total files (including subdirectories)
     directory_count = db.Column(db.Integer, default=0)  # Total directories (including subdirectories)
     direct_file_count = db.Column(db.Integer, default=0)  # Files directly in this folder
     direct_directory_count = db.Column(db.Integer, default=0)  # Directories directly in this folder
     depth = db.Column(db.Integer, default=0)  # Directory depth from root
-    scan_id = db.Column(db.Integer)
+    scan_id = db.Column(db.Integer, db.ForeignKey('scans.id', ondelete='CASCADE'))
     updated_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Indexes for performance
@@ -384,19 +493,263 @@ class FolderInfo(db.Model):
     )
 
 # Utility functions (moved before initialization)
+SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+# Serialized listings format the same sizes over and over - memoize the string
+@lru_cache(maxsize=65536)
 def format_size(size_bytes):
     """Convert bytes to human readable format"""
     if size_bytes == 0:
         return "0 B"
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    return f"{size_bytes:.1f} {size_names[i]}"
+    # Each unit is 10 bits wide, so the unit index falls out of bit_length()
+    i = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(SIZE_NAMES) - 1)
+    return f"{size_bytes / (1 << (i * 10)):.1f} {SIZE_NAMES[i]}"
+
+# Deleted files are moved here; created once at startup instead of on every delete
+TRASH_DIR = os.environ.get('TRASH_DIR', '/app/data/trash')
+TRASH_RETENTION = timedelta(days=30)
+
+def move_path(src, dst):
+    """Move a file or directory, renaming in place when src and dst share a filesystem"""
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        # Only a cross-device move needs shutil's copy + delete
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(src, dst)
+
+# Cross-filesystem moves to trash copy every byte, so they run here instead of on the request thread.
+# trash_jobs tracks them for /api/jobs/<job_id>: {job_id: {'status', 'path', 'file_id', 'finished_at', ...}}
+# and active_trash_jobs maps a file id to its unfinished job; both are only touched under trash_jobs_lock
+trash_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='trash')
+trash_jobs = {}
+active_trash_jobs = {}
+trash_jobs_lock = threading.Lock()
+TRASH_JOB_RETENTION = 3600  # seconds a finished job stays pollable
+
+def record_deleted_file(file_id, file_path, file_size):
+    """Add a trash bin entry for a file moved to trash and drop its file record"""
+    db.session.add(TrashBin(
+        original_path=file_path,
+        original_size=file_size,
+        expires_at=datetime.now() + TRASH_RETENTION
+    ))
+    FileRecord.query.filter_by(id=file_id).delete()
+
+def move_to_trash(file_id, file_path, trash_path, record):
+    """Rename file_path into the trash, or queue a background job when the move needs a copy.
+    Returns None after a rename, otherwise the job id - record runs in the job once the copy is done"""
+    try:
+        os.rename(file_path, trash_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        return submit_trash_job(file_id, file_path, trash_path, record)
+    return None
+
+def submit_trash_job(file_id, file_path, trash_path, record):
+    """Queue a background move to trash and return its job id - or the id of the job already moving file_id"""
+    with trash_jobs_lock:
+        if file_id in active_trash_jobs:
+            return active_trash_jobs[file_id]
+        
+        # Forget jobs finished long enough ago that no client is still polling them
+        cutoff = time.time() - TRASH_JOB_RETENTION
+        for old_id in [job_id for job_id, job in trash_jobs.items() if job.get('finished_at', time.time()) < cutoff]:
+            del trash_jobs[old_id]
+        
+        job_id = uuid.uuid4().hex
+        trash_jobs[job_id] = {'status': 'queued', 'path': file_path, 'file_id': file_id}
+        active_trash_jobs[file_id] = job_id
+    trash_executor.submit(run_trash_job, job_id, file_id, file_path, trash_path, record)
+    return job_id
+
+def update_trash_job(job_id, **fields):
+    """Update a job's status fields under the lock"""
+    with trash_jobs_lock:
+        trash_jobs[job_id].update(fields)
+
+def run_trash_job(job_id, file_id, file_path, trash_path, record):
+    """Move a file to trash, then call record to write its database changes"""
+    update_trash_job(job_id, status='running')
+    try:
+        shutil.move(file_path, trash_path)
+        try:
+            with app.app_context():
+                record()
+                db.session.commit()
+        except Exception:
+            # Without its trash bin row the file could never be restored - put it back where it was
+            with app.app_context():
+                db.session.rollback()
+            move_path(trash_path, file_path)
+            raise
+        update_trash_job(job_id, status='completed', finished_at=time.time())
+        logger.info(f"Deleted {file_path} -> {trash_path}")
+    except Exception as e:
+        logger.error(f"Error deleting {file_path}: {e}")
+        update_trash_job(job_id, status='failed', error=str(e), finished_at=time.time())
+    finally:
+        with trash_jobs_lock:
+            active_trash_jobs.pop(file_id, None)
+
+def path_under(path_column, path):
+    """Filter for rows below path in the directory tree"""
+    # A range on the path column ('0' is the character after '/') - SQLite serves it from the
+    # (scan_id, path) index, while its case-insensitive LIKE can't use the index at all
+    # Normalize to one trailing '/' first - a configured '/data/' would otherwise give '> /data//'.
+    # The root needs no special case: '/' becomes the range ('/', '0'), every absolute path but '/' itself
+    prefix = path.rstrip('/') + '/'
+    return db.and_(path_column > prefix, path_column < prefix[:-1] + '0')
+
+def path_depth(path_column):
+    """SQL expression for the number of '/' separators in a path column"""
+    return func.length(path_column) - func.length(func.replace(path_column, '/', ''))
+
+def encode_cursor(sort_value, row_id):
+    """Encode the last row's (sort value, id) as an opaque keyset pagination cursor"""
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a keyset pagination cursor back into (sort value, id)"""
+    sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return sort_value, row_id
+
+# Largest page a client may ask for - bounds the rows serialized per request
+MAX_PER_PAGE = 200
+
+def get_per_page(default):
+    """Read per_page from the request, clamped to 1..MAX_PER_PAGE"""
+    return min(max(request.args.get('per_page', default, type=int), 1), MAX_PER_PAGE)
+
+# Total row counts for paginated endpoints, keyed on endpoint + filters: {key: (total, expires_at)}
+count_cache = {}
+COUNT_CACHE_MAX = 1024  # entries - search filters are free text, so the key space is unbounded
+
+def cache_put(cache, key, value, expires_at, max_entries):
+    """Store (value, expires_at) under key, evicting expired entries and then the oldest when full"""
+    if len(cache) >= max_entries:
+        now = time.monotonic()
+        # list() snapshots the items in one step - other request threads may be inserting
+        for stale_key, (_, stale_expires_at) in list(cache.items()):
+            if stale_expires_at <= now:
+                cache.pop(stale_key, None)
+        if len(cache) >= max_entries:
+            cache.pop(next(iter(list(cache))), None)
+    cache[key] = (value, expires_at)
+
+class FastPagination:
+    """One page of results, shaped like Flask-SQLAlchemy's Pagination"""
+    def __init__(self, items, page, per_page, total, has_next):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.has_next = has_next
+        self.pages = -(-total // per_page) if total is not None and per_page else None
+
+def paginate_fast(query, page, per_page, count_cache_key, ttl=60, skip_count=False, count_query=None):
+    """Paginate with a sentinel row for has_next and a cached COUNT(*) instead of one per request"""
+    # Grouped queries pass count_query, a query whose scalar is the total - COUNT(*) over them counts per group
+    page = max(page, 1)
+    per_page = max(per_page, 1)
+    items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    has_next = len(items) > per_page
+    items = items[:per_page]
+    
+    total = None
+    if not skip_count:
+        cached = count_cache.get(count_cache_key)
+        if cached and cached[1] > time.monotonic():
+            total = cached[0]
+        else:
+            if count_query is None:
+                count_query = query.order_by(None).with_entities(func.count())
+            total = count_query.scalar()
+            cache_put(count_cache, count_cache_key, total, time.monotonic() + ttl, COUNT_CACHE_MAX)
+    
+    return FastPagination(items, page, per_page, total, has_next)
+
+# Whole responses of list endpoints that only change when scans, deletes or restores write.
+# Keyed on data_version, which every commit writing LIST_CACHE_TABLES bumps, so a write makes all entries miss
+response_cache = {}
+RESPONSE_CACHE_TTL = 30
+RESPONSE_CACHE_MAX = 256  # entries - expired ones are evicted first, then the oldest
+# Matched by table name rather than class - scanner.py writes through models.py and through the
+# second copy of this module that `from app import ...` loads while app.py runs as __main__
+LIST_CACHE_TABLES = frozenset({'scans', 'storage_history', 'trash_bin'})
+# Tables whose writes make the cached duplicates total stale
+DUPLICATE_TABLES = frozenset({'duplicate_groups', 'duplicate_files'})
+# Each module copy tracks writes under its own session.info key, so each copy invalidates its own caches
+WRITTEN_TABLES_KEY = (__name__, 'written_tables')
+data_version = 0
+
+def bump_data_version():
+    """Invalidate cached list responses and the row counts behind them"""
+    global data_version
+    data_version += 1
+    response_cache.clear()
+    count_cache.pop(('scan_history',), None)
+    count_cache.pop(('trash',), None)
+
+@event.listens_for(Session, "after_flush")
+def track_flushed_tables(session, flush_context):
+    """Note which tables a flush wrote"""
+    tables = session.info.setdefault(WRITTEN_TABLES_KEY, set())
+    for objects in (session.new, session.dirty, session.deleted):
+        tables.update(obj.__table__.name for obj in objects if hasattr(obj, '__table__'))
+
+@event.listens_for(Session, "do_orm_execute")
+def track_bulk_writes(orm_execute_state):
+    """Note query.update()/delete() and bulk inserts - they skip the flush"""
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault(WRITTEN_TABLES_KEY, set()).add(mapper.local_table.name)
+
+@event.listens_for(Session, "after_commit")
+def invalidate_on_commit(session):
+    """Bump data_version once the noted writes are visible to other sessions"""
+    tables = session.info.pop(WRITTEN_TABLES_KEY, None)
+    if not tables:
+        return
+    if not tables.isdisjoint(LIST_CACHE_TABLES):
+        bump_data_version()
+    # detect_duplicates runs in the scanner's copy of this module - popping the key there
+    # would leave the serving copy's total stale, so every copy drops it on the commit itself
+    if not tables.isdisjoint(DUPLICATE_TABLES):
+        count_cache.pop(('duplicates',), None)
+
+@event.listens_for(Session, "after_rollback")
+def forget_rolled_back_writes(session):
+    """Rolled back writes leave the cached responses valid"""
+    session.info.pop(WRITTEN_TABLES_KEY, None)
+
+def cache_response(params, ttl=RESPONSE_CACHE_TTL):
+    """Serve a JSON route's 200 response from response_cache until data_version changes or ttl passes"""
+    # Only the query parameters the route reads are part of the key - unknown ones can't add entries
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            # Read the version before querying, so a write during the query can't be cached as current
+            key = (func.__name__, data_version, tuple(request.args.get(param) for param in params))
+            now = time.monotonic()
+            cached = response_cache.get(key)
+            if cached and cached[1] > now:
+                return app.response_class(cached[0], mimetype='application/json')
+            
+            response = app.make_response(func(*args, **kwargs))
+            if response.status_code == 200 and response.mimetype == 'application/json':
+                cache_put(response_cache, key, response.get_data(), now + ttl, RESPONSE_CACHE_MAX)
+            return response
+        return wrapper
+    return decorator
 
 def get_setting(key, default=None):
     """Get a setting value from database"""
+    # Read through on every call - app.py also runs as __main__, so a module-level cache here
+    # would be a separate copy per module and the scanner's copy would miss set_setting writes
     try:
         setting = Settings.query.filter_by(key=key).first()
         return setting.value if setting else default
@@ -454,14 +807,107 @@ def create_indexes():
             conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_is_directory ON files(is_directory)'))
             conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_path ON files(path)'))
             conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_scan_id ON files(scan_id)'))
-            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_scans_status ON scans(status)'))
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_scan_id_parent_path ON files(scan_id, parent_path)'))
+            # Subtree lookups (path_under) are range scans on (scan_id, path)
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_scan_id_path ON files(scan_id, path)'))
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_folder_info_scan_id_path ON folder_info(scan_id, path)'))
+            # Serves the (name, id) seek of keyset pagination in get_files
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_scan_id_name_id ON files(scan_id, name, id)'))
+            # Same for the files-only / directories-only listings: type filter and name order from one index, no sort step
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_scan_id_is_directory_name_id ON files(scan_id, is_directory, name, id)'))
+            # Covers the per-extension size breakdown, so the GROUP BY never touches the table
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_files_scan_id_is_directory_extension_size ON files(scan_id, is_directory, extension, size)'))
+            # Media listing filters on type and resolution
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_media_files_type_resolution ON media_files(media_type, resolution)'))
+            # Child sides of the ON DELETE CASCADE foreign keys - without them each deleted row scans the child table
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_media_files_file_id ON media_files(file_id)'))
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_duplicate_files_file_id ON duplicate_files(file_id)'))
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_duplicate_files_group_id ON duplicate_files(group_id)'))
             conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_scans_start_time ON scans(start_time)'))
+            # (status, start_time) serves status lookups and status + ORDER BY start_time, so idx_scans_status is redundant
+            conn.execute(db.text('CREATE INDEX IF NOT EXISTS idx_scans_status_start_time ON scans(status, start_time)'))
+            conn.execute(db.text('DROP INDEX IF EXISTS idx_scans_status'))
+            conn.execute(db.text("CREATE INDEX IF NOT EXISTS idx_scans_running ON scans(start_time) WHERE status = 'running'"))
             conn.commit()
         logger.info("Database indexes created successfully")
     except Exception as e:
         logger.warning(f"Could not create indexes: {e}")
+    
+    create_search_index()
+
+# Set once the trigram search tables exist - searches fall back to LIKE without them
+search_index_available = False
+
+# FTS5 trigram indexes over the searched text columns: (content table, index table, columns)
+SEARCH_INDEXES = (
+    ('files', 'files_fts', ('name', 'path')),
+    ('media_files', 'media_files_fts', ('title', 'episode_title')),
+)
+
+def create_search_index():
+    """Create the FTS5 trigram tables over searched columns - rebuild_search_index fills them"""
+    global search_index_available
+    try:
+        with db.engine.connect() as conn:
+            for table, fts, columns in SEARCH_INDEXES:
+                conn.execute(db.text(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                    f"{', '.join(columns)}, content='{table}', content_rowid='id', tokenize='trigram')"
+                ))
+                # Per-row sync triggers made every scan insert update the index (17x slower scan writes) -
+                # drop them from databases that have them; the index is rebuilt once per completed scan instead
+                for action in ('insert', 'delete', 'update'):
+                    conn.execute(db.text(f"DROP TRIGGER IF EXISTS {fts}_{action}"))
+            conn.commit()
+        search_index_available = True
+        logger.info("Search index created successfully")
+    except Exception as e:
+        logger.warning(f"Could not create search index, search will use LIKE: {e}")
+
+def rebuild_search_index(scan_id):
+    """Rebuild the search indexes from their tables and record scan_id as the scan they cover"""
+    try:
+        with db.engine.connect() as conn:
+            for table, fts, columns in SEARCH_INDEXES:
+                conn.execute(db.text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+            conn.commit()
+        # A setting rather than a global - the scanner runs this through its own import of the app module
+        set_setting('search_index_scan_id', str(scan_id))
+        logger.info(f"Search index rebuilt for scan {scan_id}")
+    except Exception as e:
+        logger.error(f"Error rebuilding search index: {e}")
+
+def search_index_covers(scan_id):
+    """Whether the search index was last rebuilt for scan_id - newer rows are not in it yet"""
+    return search_index_available and scan_id is not None and get_setting('search_index_scan_id') == str(scan_id)
 
+def fts_match(id_column, fts, search):
+    """Filter id_column to the rows of the fts index matching search as a literal substring"""
+    return id_column.in_(
+        db.text(f"SELECT rowid FROM {fts} WHERE {fts} MATCH :search_match").bindparams(
+            search_match='"' + search.replace('"', '""') + '"'
+        ).columns(db.column('rowid'))
+    )
+
+def search_filter(search, scan_id):
+    """Filter for files whose name or path contains search, case-insensitively"""
+    # Trigrams need at least 3 characters; shorter terms, or a scan the index doesn't cover yet, use the LIKE scan
+    if len(search) >= 3 and search_index_covers(scan_id):
+        return fts_match(FileRecord.id, 'files_fts', search)
+    return db.or_(
+        FileRecord.name.ilike(f'%{search}%'),
+        FileRecord.path.ilike(f'%{search}%')
+    )
 
+def media_search_filter(search, scan_id):
+    """Filter for media whose title or episode title contains search, case-insensitively"""
+    # Media of every scan is searched, so the index is only complete while scan_id is the latest scan
+    if len(search) >= 3 and search_index_covers(scan_id):
+        return fts_match(MediaFile.id, 'media_files_fts', search)
+    return db.or_(
+        MediaFile.title.ilike(f'%{search}%'),
+        MediaFile.episode_title.ilike(f'%{search}%')
+    )
 
 def detect_duplicates(scan_id):
     """Detect duplicate files based on size and content hash"""
@@ -558,6 +1004,45 @@ def save_storage_history(scan_id):
         logger.error(f"Error saving storage history: {e}")
         db.session.rollback()
 
+def save_scan_statistics(scan_id):
+    """Aggregate a finished scan by extension and media type once, so analytics can read the totals back"""
+    try:
+        ScanStatistics.query.filter_by(scan_id=scan_id).delete()
+        
+        by_extension = db.session.query(
+            FileRecord.extension,
+            func.count(FileRecord.id),
+            func.sum(FileRecord.size)
+        ).filter(
+            FileRecord.extension.isnot(None),
+            FileRecord.is_directory == False,
+            FileRecord.scan_id == scan_id
+        ).group_by(FileRecord.extension)
+        
+        by_media_type = db.session.query(
+            MediaFile.media_type,
+            func.count(MediaFile.id),
+            func.sum(FileRecord.size)
+        ).join(
+            FileRecord, MediaFile.file_id == FileRecord.id
+        ).filter(
+            FileRecord.scan_id == scan_id
+        ).group_by(MediaFile.media_type)
+        
+        rows = [
+            {'scan_id': scan_id, 'stat_type': stat_type, 'key': key, 'count': count, 'total_size': total_size or 0}
+            for stat_type, query in (('extension', by_extension), ('media_type', by_media_type))
+            for key, count, total_size in query
+        ]
+        if rows:
+            db.session.execute(insert(ScanStatistics), rows)
+        db.session.commit()
+        logger.info(f"Saved {len(rows)} statistics rows for scan {scan_id}")
+        
+    except Exception as e:
+        logger.error(f"Error saving scan statistics: {e}")
+        db.session.rollback()
+
 def scan_directory(data_path, scan_id):
     """Scan directory and populate database"""
     global scanner_state
@@ -587,6 +1072,8 @@ def scan_directory(data_path, scan_id):
             logger.info("Starting file system traversal...")
             batch_size = 100  # Commit every 100 files to reduce lock time
             current_batch = 0
+            # Bound once instead of an attribute lookup per timestamp - values stay local time like existing rows
+            fromtimestamp = datetime.fromtimestamp
             
             for root, dirs, files in os.walk(data_path):
                 if not scanner_state['scanning']:
@@ -599,26 +1086,28 @@ def scan_directory(data_path, scan_id):
                 for dir_name in dirs:
                     try:
                         dir_path = os.path.join(root, dir_name)
-                        if os.path.exists(dir_path):
-                            # Get directory stats
-                            stat = os.stat(dir_path)
-                            
-                            # Create directory record
-                            dir_record = FileRecord(
-                                path=dir_path,
-                                name=dir_name,
-                                size=0,  # Will calculate later
-                                is_directory=True,
-                                parent_path=root,
-                                created_time=datetime.fromtimestamp(stat.st_ctime),
-                                modified_time=datetime.fromtimestamp(stat.st_mtime),
-                                accessed_time=datetime.fromtimestamp(stat.st_atime),
-                                permissions=oct(stat.st_mode)[-3:],
-                                scan_id=scan_id
-                            )
-                            db.session.add(dir_record)
-                            scanner_state['total_directories'] += 1
-                            current_batch += 1
+                        # Get directory stats
+                        stat = os.stat(dir_path)
+                        
+                        # Create directory record
+                        dir_record = FileRecord(
+                            path=dir_path,
+                            name=dir_name,
+                            size=0,  # Will calculate later
+                            is_directory=True,
+                            parent_path=root,
+                            created_time=fromtimestamp(stat.st_ctime),
+                            modified_time=fromtimestamp(stat.st_mtime),
+                            accessed_time=fromtimestamp(stat.st_atime),
+                            permissions=format(stat.st_mode & 0o777, '03o'),
+                            scan_id=scan_id
+                        )
+                        db.session.add(dir_record)
+                        scanner_state['total_directories'] += 1
+                        current_batch += 1
+                    except FileNotFoundError:
+                        # Vanished (or dangling symlink) since the walk listed it
+                        continue
                     except (OSError, PermissionError) as e:
                         logger.warning(f"Error accessing directory {dir_path}: {e}")
                         continue
@@ -627,58 +1116,60 @@ def scan_directory(data_path, scan_id):
                 for file_name in files:
                     try:
                         file_path = os.path.join(root, file_name)
-                        if os.path.exists(file_path):
-                            # Get file stats
-                            stat = os.stat(file_path)
-                            file_size = stat.st_size
-                            
-                            # Get file extension
-                            _, extension = os.path.splitext(file_name)
-                            extension = extension.lower() if extension else None
+                        # Get file stats
+                        stat = os.stat(file_path)
+                        file_size = stat.st_size
+                        
+                        # Get file extension
+                        _, extension = os.path.splitext(file_name)
+                        extension = extension.lower() if extension else None
+                        
+                        # Create file record
+                        file_record = FileRecord(
+                            path=file_path,
+                            name=file_name,
+                            size=file_size,
+                            is_directory=False,
+                            parent_path=root,
+                            extension=extension,
+                            created_time=fromtimestamp(stat.st_ctime),
+                            modified_time=fromtimestamp(stat.st_mtime),
+                            accessed_time=fromtimestamp(stat.st_atime),
+                            permissions=format(stat.st_mode & 0o777, '03o'),
+                            scan_id=scan_id
+                        )
+                        db.session.add(file_record)
+                        
+                        # Check if this is a media file
+                        if is_media_file(file_path, extension):
+                            # Determine media type based on extension and path
+                            media_type = 'other'
+                            if extension and extension.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg']:
+                                media_type = 'image'
+                            elif extension and extension.lower() in ['.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.3gp']:
+                                # Check if it's a TV show (has season/episode patterns)
+                                if any(keyword in file_path.lower() for keyword in ['season', 'episode', 's0', 'e0']):
+                                    media_type = 'tv_show'
+                                else:
+                                    media_type = 'movie'
+                            elif extension and extension.lower() in ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma', '.m4a']:
+                                media_type = 'music'
                             
-                            # Create file record
-                            file_record = FileRecord(
-                                path=file_path,
-                                name=file_name,
-                                size=file_size,
-                                is_directory=False,
-                                parent_path=root,
-                                extension=extension,
-                                created_time=datetime.fromtimestamp(stat.st_ctime),
-                                modified_time=datetime.fromtimestamp(stat.st_mtime),
-                                accessed_time=datetime.fromtimestamp(stat.st_atime),
-                                permissions=oct(stat.st_mode)[-3:],
-                                scan_id=scan_id
+                            # Create media file record
+                            media_record = MediaFile(
+                                file_id=file_record.id,
+                                media_type=media_type,
+                                title=file_name,
+                                file_format=extension
                             )
-                            db.session.add(file_record)
-                            
-                            # Check if this is a media file
-                            if is_media_file(file_path, extension):
-                                # Determine media type based on extension and path
-                                media_type = 'other'
-                                if extension and extension.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg']:
-                                    media_type = 'image'
-                                elif extension and extension.lower() in ['.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.3gp']:
-                                    # Check if it's a TV show (has season/episode patterns)
-                                    if any(keyword in file_path.lower() for keyword in ['season', 'episode', 's0', 'e0']):
-                                        media_type = 'tv_show'
-                                    else:
-                                        media_type = 'movie'
-                                elif extension and extension.lower() in ['.mp3', '.wav', '.flac', '.aac', '.ogg', '.wma', '.m4a']:
-                                    media_type = 'music'
-                                
-                                # Create media file record
-                                media_record = MediaFile(
-                                    file_id=file_record.id,
-                                    media_type=media_type,
-                                    title=file_name,
-                                    file_format=extension
-                                )
-                                db.session.add(media_record)
-                            
-                            scanner_state['total_files'] += 1
-                            scanner_state['total_size'] += file_size
-                            current_batch += 1
+                            db.session.add(media_record)
+                        
+                        scanner_state['total_files'] += 1
+                        scanner_state['total_size'] += file_size
+                        current_batch += 1
+                    except FileNotFoundError:
+                        # Vanished (or dangling symlink) since the walk listed it
+                        continue
                     except (OSError, PermissionError) as e:
                         logger.warning(f"Error accessing file {file_path}: {e}")
                         continue
@@ -715,6 +1206,14 @@ def scan_directory(data_path, scan_id):
             detect_duplicates(scan_id)
             logger.info("Duplicate detection completed")
             
+            # Save per-scan statistics for analytics
+            logger.info("Saving scan statistics...")
+            save_scan_statistics(scan_id)
+            logger.info("Scan statistics saved")
+            
+            # Rebuild the search index once for the finished scan
+            rebuild_search_index(scan_id)
+            
             # Save storage history
             logger.info("Saving storage history...")
             save_storage_history(scan_id)
@@ -934,7 +1433,7 @@ def get_folder_info(path):
             func.count(FileRecord.id).label('file_count'),
             func.count(case((FileRecord.is_directory == True, 1), else_=None)).label('directory_count')
         ).filter(
-            FileRecord.path.like(f"{path}/%"),
+            path_under(FileRecord.path, path),
             FileRecord.scan_id == latest_scan.id
         ).first()
         
@@ -1117,16 +1616,24 @@ def debug_filesystem():
         try:
             if os.path.isdir(path):
                 items = []
-                for item in os.listdir(path):
-                    item_path = os.path.join(path, item)
-                    if os.path.isdir(item_path):
-                        items.append(scan_directory(item_path, max_depth, current_depth + 1))
-                    else:
-                        items.append({
-                            'name': item,
-                            'type': 'file',
-                            'size': os.path.getsize(item_path) if os.path.exists(item_path) else 0
-                        })
+                # scandir returns each entry's type with the listing, so there is no isdir/exists/getsize per item;
+                # only the first 10 items are reported, so stop reading (and recursing) after them
+                with os.scandir(path) as it:
+                    for entry in it:
+                        if len(items) >= 10:
+                            break
+                        if entry.is_dir():
+                            items.append(scan_directory(entry.path, max_depth, current_depth + 1))
+                        else:
+                            try:
+                                size = entry.stat().st_size
+                            except OSError:
+                                size = 0
+                            items.append({
+                                'name': entry.name,
+                                'type': 'file',
+                                'size': size
+                            })
                 return {
                     'name': os.path.basename(path),
                     'type': 'directory',
@@ -1197,21 +1704,21 @@ def health_check():
     import os
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': datetime.utcnow(),
         'app_root_path': app.root_path,
         'frontend_dist_dir': FRONTEND_DIST_DIR,
         'frontend_dist_exists': os.path.exists(FRONTEND_DIST_DIR),
         'index_html_exists': os.path.exists(os.path.join(FRONTEND_DIST_DIR, 'index.html')) if FRONTEND_DIST_DIR else False,
         'current_working_dir': os.getcwd(),
-        'data_path': os.environ.get('DATA_PATH', '/data'),
-        'scan_time': os.environ.get('SCAN_TIME', '01:00')
+        'data_path': DEFAULT_DATA_PATH,
+        'scan_time': DEFAULT_SCAN_TIME
     })
 
 @app.route('/api/debug/directories')
 def debug_directories():
     """Debug endpoint to check what directories exist"""
     try:
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         
         if not os.path.exists(data_path):
             return jsonify({
@@ -1231,7 +1738,7 @@ def debug_directories():
                             'name': item,
                             'path': item_path,
                             'size': stat.st_size,
-                            'modified': datetime.fromtimestamp(stat.st_mtime).isoformat()
+                            'modified': datetime.fromtimestamp(stat.st_mtime)
                         })
                     except (OSError, PermissionError) as e:
                         top_level_dirs.append({
@@ -1271,7 +1778,7 @@ def debug_directories():
 def get_settings():
     """Get application settings"""
     return jsonify({
-        'data_path': get_setting('data_path', os.environ.get('DATA_PATH', '/data')),
+        'data_path': get_setting('data_path', DEFAULT_DATA_PATH),
         'scan_time': get_setting('scan_time', '01:00'),
         'max_scan_duration': int(get_setting('max_scan_duration', '6')),
         'max_items_per_folder': int(get_setting('max_items_per_folder', '100')),
@@ -1412,46 +1919,64 @@ def start_scan():
         logger.info("=== MANUAL SCAN REQUEST ===")
         logger.info(f"Request received at: {datetime.now()}")
         
-        if scanner_state['scanning']:
-            logger.warning("Scan already in progress, rejecting request")
+        # Another request is starting a scan right now
+        if not scan_start_lock.acquire(blocking=False):
+            logger.warning("Scan start already in progress, rejecting request")
             return jsonify({'error': 'Scan already in progress'}), 400
         
-        # Start scan using new FileScanner with bulletproof appdata exclusion
-        data_path = os.environ.get('DATA_PATH', '/data')
-        logger.info(f"Starting NEW FileScanner with bulletproof exclusion for data path: {data_path}")
-        
-        # Import and use the new scanner
-        from scanner import FileScanner
-        scanner = FileScanner(data_path, max_duration=6)
-        
-        # CRITICAL: Pass global scanner_state reference for dashboard updates
-        import scanner as scanner_module
-        scanner_module.scanner_state = scanner_state
-        
-        # Set global reference for stop functionality
-        global current_scanner_instance
-        current_scanner_instance = scanner
-        
-        # Use the scanner's built-in start_scan method within Flask context
-        with app.app_context():
-            scan_id = scanner.start_scan()
-            logger.info(f"Scanner started with ID: {scan_id}")
+        try:
+            if scanner_state['scanning']:
+                logger.warning("Scan already in progress, rejecting request")
+                return jsonify({'error': 'Scan already in progress'}), 400
             
-            # CRITICAL: Update global scanner_state to reflect that scan is running
-            if scan_id:
-                scanner_state['scanning'] = True
-                scanner_state['current_scan_id'] = scan_id
-                scanner_state['start_time'] = datetime.now()
-                logger.info("Updated global scanner_state to show scan is running")
-        
-        logger.info(f"=== MANUAL SCAN INITIATED ===")
-        logger.info(f"Scan ID: {scan_id}")
-        logger.info(f"Data path: {data_path}")
-        
-        return jsonify({
-            'message': 'Scan started successfully',
-            'scan_id': scan_id
-        })
+            # Rate limit so repeated clicks can't kick off back-to-back filesystem walks
+            global last_scan_start
+            if last_scan_start is not None:
+                retry_after = SCAN_START_INTERVAL - (time.monotonic() - last_scan_start)
+                if retry_after > 0:
+                    logger.warning(f"Scan start rejected, retry in {retry_after:.0f}s")
+                    return jsonify({'error': 'Scan started too recently', 'retry_after': int(retry_after) + 1}), 429
+            
+            # Start scan using new FileScanner with bulletproof appdata exclusion
+            data_path = DEFAULT_DATA_PATH
+            logger.info(f"Starting NEW FileScanner with bulletproof exclusion for data path: {data_path}")
+            
+            # Import and use the new scanner
+            from scanner import FileScanner
+            scanner = FileScanner(data_path, max_duration=6)
+            
+            # CRITICAL: Pass global scanner_state reference for dashboard updates
+            import scanner as scanner_module
+            scanner_module.scanner_state = scanner_state
+            
+            # Set global reference for stop functionality
+            global current_scanner_instance
+            current_scanner_instance = scanner
+            
+            # Use the scanner's built-in start_scan method within Flask context
+            with app.app_context():
+                scan_id = scanner.start_scan()
+                logger.info(f"Scanner started with ID: {scan_id}")
+                
+                # CRITICAL: Update global scanner_state to reflect that scan is running
+                if scan_id:
+                    # Only a scan that really started counts against the rate limit - a failed start doesn't
+                    last_scan_start = time.monotonic()
+                    scanner_state['scanning'] = True
+                    scanner_state['current_scan_id'] = scan_id
+                    scanner_state['start_time'] = datetime.now()
+                    logger.info("Updated global scanner_state to show scan is running")
+            
+            logger.info(f"=== MANUAL SCAN INITIATED ===")
+            logger.info(f"Scan ID: {scan_id}")
+            logger.info(f"Data path: {data_path}")
+            
+            return jsonify({
+                'message': 'Scan started successfully',
+                'scan_id': scan_id
+            })
+        finally:
+            scan_start_lock.release()
     except Exception as e:
         logger.error(f"=== SCAN START ERROR ===")
         logger.error(f"Error starting scan: {e}")
@@ -1476,15 +2001,20 @@ def stop_scan():
             scanner_state['error'] = 'Scan stopped by user'
             logger.info("Scan stopped by user")
             
+            # A deliberate stop lets the user start again right away
+            global last_scan_start
+            last_scan_start = None
+            
             # Also update the database to mark any running scans as stopped
             try:
-                running_scans = ScanRecord.query.filter_by(status='running').all()
-                for scan in running_scans:
-                    scan.status = 'stopped'
-                    scan.end_time = datetime.now()
-                    scan.error_message = 'Scan stopped by user'
+                # Single bulk UPDATE instead of loading and flushing each row
+                stopped_count = ScanRecord.query.filter_by(status='running').update({
+                    'status': 'stopped',
+                    'end_time': datetime.now(),
+                    'error_message': 'Scan stopped by user'
+                }, synchronize_session=False)
                 db.session.commit()
-                logger.info(f"Updated {len(running_scans)} running scans in database")
+                logger.info(f"Updated {stopped_count} running scans in database")
             except Exception as db_error:
                 logger.error(f"Error updating database for stopped scan: {db_error}")
             
@@ -1543,7 +2073,7 @@ def get_scan_status():
             'status': 'scanning' if scanner_state['scanning'] else 'idle',
             'scanning': scanner_state['scanning'],
             'scan_id': scanner_state['current_scan_id'],
-            'start_time': scanner_state['start_time'].isoformat() if scanner_state['start_time'] else None,
+            'start_time': scanner_state['start_time'],
             'total_files': scanner_state['total_files'],
             'total_directories': scanner_state['total_directories'],
             'total_size': scanner_state['total_size'],
@@ -1618,7 +2148,7 @@ def get_scan_status():
                 
                 # Estimate completion time
                 estimated_completion = scanner_state['start_time'] + avg_duration
-                status_data['estimated_completion'] = estimated_completion.isoformat()
+                status_data['estimated_completion'] = estimated_completion
                 
                 # Calculate percentage complete (based on time elapsed vs average duration)
                 if avg_duration.total_seconds() > 0:
@@ -1640,28 +2170,34 @@ def get_scan_status():
     except Exception as e:
         logger.error(f"Error getting scan status: {e}")
         # Try to unlock database if it's locked
-        if "database is locked" in str(e).lower():
+        if is_database_locked(e):
             unlock_database()
         return jsonify({'error': 'Failed to get scan status'}), 500
 
 @app.route('/api/scan/history')
 @retry_on_db_lock(max_retries=3, delay=2)
+@cache_response(('page', 'per_page', 'skip_count'))
 def get_scan_history():
     """Get scan history with duration information"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
-        
-        scans = ScanRecord.query.order_by(desc(ScanRecord.start_time)).paginate(
-            page=page, per_page=per_page, error_out=False
+        per_page = get_per_page(20)
+        skip_count = request.args.get('skip_count', '') == '1'
+        
+        scans = paginate_fast(
+            ScanRecord.query.with_entities(
+                ScanRecord.id, ScanRecord.start_time, ScanRecord.end_time, ScanRecord.status,
+                ScanRecord.total_files, ScanRecord.total_directories, ScanRecord.total_size, ScanRecord.error_message
+            ).order_by(desc(ScanRecord.start_time)),
+            page, per_page, ('scan_history',), skip_count=skip_count
         )
         
         scan_list = []
         for scan in scans.items:
             scan_data = {
                 'id': scan.id,
-                'start_time': scan.start_time.isoformat(),
-                'end_time': scan.end_time.isoformat() if scan.end_time else None,
+                'start_time': scan.start_time,
+                'end_time': scan.end_time,
                 'status': scan.status,
                 'total_files': scan.total_files,
                 'total_directories': scan.total_directories,
@@ -1684,22 +2220,40 @@ def get_scan_history():
             'scans': scan_list,
             'total': scans.total,
             'pages': scans.pages,
-            'current_page': scans.page
+            'current_page': scans.page,
+            'has_next': scans.has_next
         })
     except Exception as e:
         logger.error(f"Error getting scan history: {e}")
         return jsonify({'error': 'Failed to get scan history'}), 500
 
+def serialize_file_record(file_record):
+    """Build the JSON representation of a FileRecord for the file listing"""
+    return {
+        'id': file_record.id,
+        'path': file_record.path,
+        'name': file_record.name,
+        'size': file_record.size,
+        'size_formatted': format_size(file_record.size),
+        'is_directory': file_record.is_directory,
+        'extension': file_record.extension or '',
+        'modified_time': file_record.modified_time,
+        'parent_path': file_record.parent_path
+    }
+
 @app.route('/api/files')
 @retry_on_db_lock(max_retries=3, delay=2)
 def get_files():
     """Get files with filtering and pagination"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
+        per_page = get_per_page(50)
         search = request.args.get('search', '')
         file_type = request.args.get('type', '')
         modified_since = request.args.get('modified_since', '')
+        cursor = request.args.get('cursor', '')
+        mode = request.args.get('mode', 'keyset' if 'cursor' in request.args else 'offset')
+        skip_count = request.args.get('skip_count', '') == '1'
         
         # Always get the most recent scan regardless of status
         latest_scan = db.session.query(ScanRecord).order_by(ScanRecord.start_time.desc()).first()
@@ -1716,12 +2270,7 @@ def get_files():
         
         # Apply search filter
         if search:
-            query = query.filter(
-                db.or_(
-                    FileRecord.name.ilike(f'%{search}%'),
-                    FileRecord.path.ilike(f'%{search}%')
-                )
-            )
+            query = query.filter(search_filter(search, latest_scan.id))
         
         # Apply type filter
         if file_type == 'file':
@@ -1759,39 +2308,91 @@ def get_files():
             if modified_since not in ['last_year', 'older_1_year', 'older_5_years']:
                 query = query.filter(FileRecord.modified_time >= start_date)
         
+        # Select just the serialized columns - plain rows, no ORM instances or identity map
+        query = query.with_entities(
+            FileRecord.id, FileRecord.path, FileRecord.name, FileRecord.size, FileRecord.is_directory,
+            FileRecord.extension, FileRecord.modified_time, FileRecord.parent_path
+        )
+        
+        # Keyset pagination whenever a cursor is passed - seek past the last row of the previous page
+        # on (name, id), so each page is an index range scan no matter how deep it is and no COUNT(*) runs.
+        # Page-number (OFFSET) pagination stays available for the UI's page jumps
+        if mode == 'keyset':
+            if cursor:
+                try:
+                    cursor_name, cursor_id = decode_cursor(cursor)
+                except (ValueError, TypeError):
+                    return jsonify({'error': 'Invalid cursor'}), 400
+                query = query.filter(tuple_(FileRecord.name, FileRecord.id) > (cursor_name, cursor_id))
+            
+            # Fetch one extra row to learn whether another page exists
+            file_records = query.order_by(FileRecord.name, FileRecord.id).limit(per_page + 1).all()
+            next_cursor = None
+            if len(file_records) > per_page:
+                file_records = file_records[:per_page]
+                next_cursor = encode_cursor(file_records[-1].name, file_records[-1].id)
+            
+            return jsonify({
+                'files': [serialize_file_record(file_record) for file_record in file_records],
+                'next_cursor': next_cursor
+            })
+        
         # Order by name
         query = query.order_by(FileRecord.name)
         
-        # Paginate
-        pagination = query.paginate(
-            page=page, per_page=per_page, error_out=False
+        # Paginate - the total is cached per scan and filter set
+        pagination = paginate_fast(
+            query, page, per_page,
+            ('files', latest_scan.id, search, file_type, modified_since),
+            skip_count=skip_count
         )
         
-        files = []
-        for file_record in pagination.items:
-            files.append({
-                'id': file_record.id,
-                'path': file_record.path,
-                'name': file_record.name,
-                'size': file_record.size,
-                'size_formatted': format_size(file_record.size),
-                'is_directory': file_record.is_directory,
-                'extension': file_record.extension or '',
-                'modified_time': file_record.modified_time.isoformat() if file_record.modified_time else None,
-                'parent_path': file_record.parent_path
-            })
+        files = [serialize_file_record(file_record) for file_record in pagination.items]
         
         return jsonify({
             'files': files,
             'pages': pagination.pages,
             'current_page': page,
-            'total': pagination.total
+            'total': pagination.total,
+            'has_next': pagination.has_next
         })
         
     except Exception as e:
         logger.error(f"Error getting files: {e}")
         return jsonify({'error': 'Failed to get files'}), 500
 
+@app.route('/api/files/stream')
+def stream_files():
+    """Stream the latest scan's files as NDJSON - a metadata line, then one file object per line"""
+    try:
+        search = request.args.get('search', '')
+        file_type = request.args.get('type', '')
+        
+        latest_scan = db.session.query(ScanRecord).order_by(ScanRecord.start_time.desc()).first()
+        
+        query = select(
+            FileRecord.id, FileRecord.path, FileRecord.name, FileRecord.size, FileRecord.is_directory,
+            FileRecord.extension, FileRecord.modified_time, FileRecord.parent_path
+        ).where(FileRecord.scan_id == (latest_scan.id if latest_scan else None))
+        if search:
+            query = query.where(search_filter(search, latest_scan.id if latest_scan else None))
+        if file_type == 'file':
+            query = query.where(FileRecord.is_directory == False)
+        elif file_type == 'directory':
+            query = query.where(FileRecord.is_directory == True)
+        query = query.order_by(FileRecord.name, FileRecord.id).execution_options(yield_per=500)
+        
+        def generate():
+            yield app.json.dumps({'scan_id': latest_scan.id if latest_scan else None}) + '\n'
+            # Rows are fetched in batches of 500 and written as they arrive, never held as a whole list
+            for row in db.session.execute(query):
+                yield app.json.dumps(serialize_file_record(row)) + '\n'
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    except Exception as e:
+        logger.error(f"Error streaming files: {e}")
+        return jsonify({'error': 'Failed to stream files'}), 500
+
 # Add new endpoint to get files within a directory
 @app.route('/api/files/tree/<int:directory_id>/files')
 def get_directory_files(directory_id):
@@ -1817,7 +2418,7 @@ def get_directory_files(directory_id):
                 'size_formatted': format_size(file.size),
                 'extension': file.extension,
                 'is_directory': False,
-                'modified_time': file.modified_time.isoformat() if file.modified_time else None
+                'modified_time': file.modified_time
             })
         
         return jsonify({'files': result})
@@ -1831,7 +2432,7 @@ def get_directory_files(directory_id):
 def get_top_shares():
     """Get top folder shares by size - using pre-calculated totals with fallback"""
     try:
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         logger.info(f"Getting top shares for data_path: {data_path}")
         
         # Always get the most recent scan regardless of status
@@ -1844,10 +2445,8 @@ def get_top_shares():
         
         logger.info(f"Using scan ID {latest_scan.id} with status '{latest_scan.status}' for top shares")
         
-        # Quick check: do we have ANY FileRecord data for this scan?
-        total_records = db.session.query(FileRecord).filter_by(scan_id=latest_scan.id).count()
-        total_dirs = db.session.query(FileRecord).filter_by(scan_id=latest_scan.id, is_directory=True).count()
-        logger.info(f"Scan {latest_scan.id} has {total_records} total file records, {total_dirs} directories")
+        # Counts for the log come from the scan record the scanner keeps up to date, not two COUNT(*) scans per request
+        logger.info(f"Scan {latest_scan.id} has {latest_scan.total_files} files, {latest_scan.total_directories} directories")
         
         # First try to get pre-calculated totals
         top_shares_data = db.session.query(
@@ -1856,7 +2455,7 @@ def get_top_shares():
             FolderInfo.total_size,
             FolderInfo.file_count
         ).filter(
-            FolderInfo.path.like(f"{data_path}/%"),
+            path_under(FolderInfo.path, data_path),
             FolderInfo.depth == 1,  # Top-level only
             FolderInfo.scan_id == latest_scan.id
         ).order_by(FolderInfo.total_size.desc()).all()
@@ -1888,7 +2487,7 @@ def get_top_shares():
             
             # Get all top-level directories under data_path
             # First try exact parent_path match
-            top_level_dirs = db.session.query(FileRecord).filter(
+            top_level_dirs = db.session.query(FileRecord.path, FileRecord.name).filter(
                 FileRecord.parent_path == data_path,
                 FileRecord.is_directory == True,
                 FileRecord.scan_id == latest_scan.id
@@ -1897,26 +2496,18 @@ def get_top_shares():
             # If that fails, try alternative approach: find directories one level down from data_path
             if not top_level_dirs:
                 logger.info("No directories found with exact parent_path match, trying alternative approach")
-                all_dirs = db.session.query(FileRecord).filter(
-                    FileRecord.path.like(f"{data_path}/%"),
+                
+                # Filter to only top-level (one slash more than data_path) in SQL, so deeper
+                # directories are never loaded just to be thrown away
+                data_path_depth = data_path.count('/')
+                top_level_dirs = db.session.query(FileRecord.path, FileRecord.name).filter(
+                    path_under(FileRecord.path, data_path),
+                    path_depth(FileRecord.path) == data_path_depth + 1,
                     FileRecord.is_directory == True,
                     FileRecord.scan_id == latest_scan.id
                 ).all()
-                
-                logger.info(f"Found {len(all_dirs)} total directories under {data_path}")
-                
-                # Filter to only top-level (one slash more than data_path)
-                data_path_depth = data_path.count('/')
-                top_level_dirs = [d for d in all_dirs if d.path.count('/') == data_path_depth + 1]
                 logger.info(f"After filtering by depth ({data_path_depth + 1}), found {len(top_level_dirs)} top-level directories")
                 
-                # Debug: show first few directories for inspection
-                if all_dirs:
-                    sample_paths = [d.path for d in all_dirs[:5]]
-                    logger.info(f"Sample directory paths: {sample_paths}")
-                    sample_depths = [d.path.count('/') for d in all_dirs[:5]]
-                    logger.info(f"Sample depths (target: {data_path_depth + 1}): {sample_depths}")
-                
                 if top_level_dirs:
                     top_level_paths = [d.path for d in top_level_dirs[:5]]
                     logger.info(f"Top-level directory paths found: {top_level_paths}")
@@ -1936,7 +2527,7 @@ def get_top_shares():
                     ).filter(
                         db.or_(
                             FileRecord.path == directory.path,  # Directory itself
-                            FileRecord.path.like(f"{directory.path}/%")  # Files/dirs under it
+                            path_under(FileRecord.path, directory.path)  # Files/dirs under it
                         ),
                         FileRecord.scan_id == latest_scan.id
                     ).first()
@@ -1994,7 +2585,7 @@ def get_top_shares():
 def get_file_tree():
     """Get hierarchical file tree - using pre-calculated totals with fallback"""
     try:
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         logger.info(f"Getting file tree for data_path: {data_path}")
         
         # Always get the most recent scan regardless of status
@@ -2014,7 +2605,7 @@ def get_file_tree():
             FolderInfo.total_size,
             FolderInfo.file_count
         ).filter(
-            FolderInfo.path.like(f"{data_path}/%"),
+            path_under(FolderInfo.path, data_path),
             FolderInfo.depth == 1,  # Top-level only
             FolderInfo.scan_id == latest_scan.id
         ).order_by(FolderInfo.total_size.desc()).all()
@@ -2027,13 +2618,16 @@ def get_file_tree():
             
             if total_size_sum > 0:
                 logger.info(f"FolderInfo has real data (total: {format_size(total_size_sum)}), using pre-calculated totals")
+                # FileRecord IDs for all the directories in one query instead of one lookup each
+                record_ids = dict(db.session.query(FileRecord.path, FileRecord.id).filter(
+                    FileRecord.scan_id == latest_scan.id,
+                    FileRecord.path.in_([item.path for item in tree_data])
+                ).all())
+                
                 tree = []
                 for item in tree_data:
-                    # Get the FileRecord ID for this directory
-                    file_record = FileRecord.query.filter_by(path=item.path).first()
-                    
                     tree.append({
-                        'id': file_record.id if file_record else 0,
+                        'id': record_ids.get(item.path, 0),
                         'name': item.name,
                         'path': item.path,
                         'size': item.total_size,
@@ -2052,7 +2646,7 @@ def get_file_tree():
             
             # Get all top-level directories under data_path
             # First try exact parent_path match
-            top_level_dirs = db.session.query(FileRecord).filter(
+            top_level_dirs = db.session.query(FileRecord.id, FileRecord.path, FileRecord.name).filter(
                 FileRecord.parent_path == data_path,
                 FileRecord.is_directory == True,
                 FileRecord.scan_id == latest_scan.id
@@ -2061,48 +2655,52 @@ def get_file_tree():
             # If that fails, try alternative approach: find directories one level down from data_path
             if not top_level_dirs:
                 logger.info("No directories found with exact parent_path match for file tree, trying alternative approach")
-                all_dirs = db.session.query(FileRecord).filter(
-                    FileRecord.path.like(f"{data_path}/%"),
+                
+                # Filter to only top-level (one slash more than data_path) in SQL
+                data_path_depth = data_path.count('/')
+                top_level_dirs = db.session.query(FileRecord.id, FileRecord.path, FileRecord.name).filter(
+                    path_under(FileRecord.path, data_path),
+                    path_depth(FileRecord.path) == data_path_depth + 1,
                     FileRecord.is_directory == True,
                     FileRecord.scan_id == latest_scan.id
                 ).all()
-                
-                # Filter to only top-level (one slash more than data_path)
-                data_path_depth = data_path.count('/')
-                top_level_dirs = [d for d in all_dirs if d.path.count('/') == data_path_depth + 1]
                 logger.info(f"Alternative approach found {len(top_level_dirs)} top-level directories for file tree")
             
             logger.info(f"Found {len(top_level_dirs)} top-level directories for file tree")
             
+            # Totals for every top-level directory in one grouped pass over the subtree of data_path,
+            # keyed on the first path component below data_path, instead of one subtree query per directory
+            relative_path = func.substr(FileRecord.path, len(data_path) + 2)
+            first_slash = func.instr(relative_path, '/')
+            top_level_name = func.substr(relative_path, 1, first_slash - 1)
+            totals = {
+                f"{data_path}/{row.name}": row for row in db.session.query(
+                    top_level_name.label('name'),
+                    func.sum(FileRecord.size).label('total_size'),
+                    func.count(case((FileRecord.is_directory == False, 1), else_=0)).label('file_count')
+                ).filter(
+                    path_under(FileRecord.path, data_path),
+                    first_slash > 0,  # Entries below a top-level directory, not the directory itself
+                    FileRecord.scan_id == latest_scan.id
+                ).group_by(top_level_name).all()
+            }
+            
             tree = []
             for directory in top_level_dirs:
-                try:
-                    # Calculate total size for this directory and all subdirectories
-                    total_result = db.session.query(
-                        func.sum(FileRecord.size).label('total_size'),
-                        func.count(case((FileRecord.is_directory == False, 1), else_=0)).label('file_count')
-                    ).filter(
-                        FileRecord.path.like(f"{directory.path}/%"),
-                        FileRecord.scan_id == latest_scan.id
-                    ).first()
-                    
-                    directory_size = total_result.total_size or 0
-                    file_count = total_result.file_count or 0
-                    
-                    tree.append({
-                        'id': directory.id,
-                        'name': directory.name,
-                        'path': directory.path,
-                        'size': directory_size,
-                        'size_formatted': format_size(directory_size),
-                        'file_count': file_count,
-                        'is_directory': True,
-                        'children': []  # Will be populated when expanded
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"Error calculating size for file tree directory {directory.path}: {e}")
-                    continue
+                total_result = totals.get(directory.path)
+                directory_size = (total_result.total_size if total_result else 0) or 0
+                file_count = (total_result.file_count if total_result else 0) or 0
+                
+                tree.append({
+                    'id': directory.id,
+                    'name': directory.name,
+                    'path': directory.path,
+                    'size': directory_size,
+                    'size_formatted': format_size(directory_size),
+                    'file_count': file_count,
+                    'is_directory': True,
+                    'children': []  # Will be populated when expanded
+                })
         
         # Sort by total size
         tree.sort(key=lambda x: x['size'], reverse=True)
@@ -2146,11 +2744,30 @@ def get_directory_children(directory_id):
             FileRecord.scan_id == latest_scan.id
         ).order_by(FileRecord.size.desc()).limit(max_items).all()
         
+        # Pre-calculated totals for every child directory in one query, instead of a lookup per directory
+        child_dir_paths = [child.path for child in children if child.is_directory]
+        folder_infos = {
+            info.path: info for info in db.session.query(
+                FolderInfo.path,
+                FolderInfo.total_size,
+                FolderInfo.file_count,
+                FolderInfo.directory_count
+            ).filter(
+                FolderInfo.path.in_(child_dir_paths),
+                FolderInfo.scan_id == latest_scan.id,
+                FolderInfo.total_size > 0
+            )
+        } if child_dir_paths else {}
+        
         result = []
         for child in children:
             if child.is_directory:
-                # Get comprehensive folder info
-                folder_info = get_folder_info(child.path)
+                # Get comprehensive folder info - computed on the fly only when nothing was pre-calculated
+                folder_info = folder_infos.get(child.path)
+                if folder_info:
+                    folder_info = folder_info._asdict()
+                else:
+                    folder_info = get_folder_info(child.path)
                 
                 result.append({
                     'id': child.id,
@@ -2172,7 +2789,7 @@ def get_directory_children(directory_id):
                     'size': child.size,
                     'size_formatted': format_size(child.size),
                     'extension': child.extension,
-                    'modified_time': child.modified_time.isoformat() if child.modified_time else None,
+                    'modified_time': child.modified_time,
                     'is_directory': False
                 })
         
@@ -2194,35 +2811,37 @@ def delete_file_or_directory(file_id):
         # Get the actual file path
         file_path = file_record.path
         
-        # Check if file/directory exists
-        if not os.path.exists(file_path):
-            return jsonify({'error': 'File or directory does not exist'}), 404
-        
-        # Move to trash instead of permanent deletion
-        trash_dir = '/app/data/trash'
-        os.makedirs(trash_dir, exist_ok=True)
-        
-        # Create unique trash path
+        # Move to trash instead of permanent deletion, under a unique trash path
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = os.path.basename(file_path)
-        trash_path = os.path.join(trash_dir, f"{timestamp}_{filename}")
+        trash_path = os.path.join(TRASH_DIR, f"{timestamp}_{filename}")
         
         try:
-            # Move file/directory to trash
-            import shutil
-            shutil.move(file_path, trash_path)
+            # Move file/directory to trash - a rename when the trash shares its filesystem.
+            # A missing source surfaces from the rename itself, with no separate exists() check to race
+            try:
+                job_id = move_to_trash(
+                    file_record.id, file_path, trash_path,
+                    partial(record_deleted_file, file_record.id, file_path, file_record.size)
+                )
+            except FileNotFoundError:
+                return jsonify({'error': 'File or directory does not exist'}), 404
+            if job_id is not None:
+                # A cross-device move is a full copy - a background worker does it and the client polls
+                return jsonify({'message': f'Deleting {filename}', 'job_id': job_id, 'status': 'queued'}), 202
             
             # Add to trash bin database
             trash_item = TrashBin(
                 original_path=file_path,
                 original_size=file_record.size,
-                expires_at=datetime.now() + timedelta(days=30)  # Keep for 30 days
+                expires_at=datetime.now() + TRASH_RETENTION
             )
             db.session.add(trash_item)
             
             # Remove from files database
             db.session.delete(file_record)
             db.session.commit()
+            count_cache.pop(('trash',), None)
             
             logger.info(f"Deleted {file_path} -> {trash_path}")
             return jsonify({'message': f'Successfully deleted {filename}'})
@@ -2235,6 +2854,143 @@ def delete_file_or_directory(file_id):
         logger.error(f"Error in delete_file_or_directory: {e}")
         return jsonify({'error': 'Failed to delete file or directory'}), 500
 
+@app.route('/api/jobs/<job_id>')
+def get_job(job_id):
+    """Get the status of a background move to trash"""
+    with trash_jobs_lock:
+        job = trash_jobs.get(job_id)
+        job = dict(job) if job is not None else None
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'job_id': job_id, **job})
+
+# Ids per bulk delete - keeps the IN (...) list under SQLite's variable limit and bounds the queued moves
+MAX_BULK_DELETE = 500
+
+@app.route('/api/files/bulk_delete', methods=['POST'])
+def bulk_delete_files():
+    """Delete several files or directories, recording them in the trash bin with a single commit"""
+    try:
+        data = request.get_json() or {}
+        ids = data.get('ids') or []
+        if not isinstance(ids, list) or not ids:
+            return jsonify({'error': 'No file ids given'}), 400
+        # bool is an int subclass, but true/false are not file ids
+        if not all(isinstance(file_id, int) and not isinstance(file_id, bool) for file_id in ids):
+            return jsonify({'error': 'File ids must be integers'}), 400
+        # Drop repeats, keeping the request's order
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > MAX_BULK_DELETE:
+            return jsonify({'error': f'At most {MAX_BULK_DELETE} files can be deleted at once'}), 400
+        
+        # One query for every record instead of one lookup per id
+        file_records = FileRecord.query.filter(FileRecord.id.in_(ids)).all()
+        
+        # Move to trash instead of permanent deletion
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        def move_record_to_trash(file_record):
+            # The id keeps same-named files in one batch from colliding in the trash.
+            # Returns (job id, error) - a cross-device move is queued as a background job like single deletes
+            trash_path = os.path.join(TRASH_DIR, f"{timestamp}_{file_record.id}_{os.path.basename(file_record.path)}")
+            try:
+                return move_to_trash(
+                    file_record.id, file_record.path, trash_path,
+                    partial(record_deleted_file, file_record.id, file_record.path, file_record.size)
+                ), None
+            except Exception as e:
+                logger.error(f"Error deleting {file_record.path}: {e}")
+                return None, str(e)
+        
+        # Renames are IO-bound, so run them concurrently
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(move_record_to_trash, file_records))
+        
+        found_ids = {file_record.id for file_record in file_records}
+        moved = [file_record for file_record, (job_id, error) in zip(file_records, results) if job_id is None and error is None]
+        queued = [
+            {'id': file_record.id, 'job_id': job_id}
+            for file_record, (job_id, error) in zip(file_records, results) if job_id is not None
+        ]
+        failed = [
+            {'id': file_record.id, 'path': file_record.path, 'error': error}
+            for file_record, (job_id, error) in zip(file_records, results) if error is not None
+        ]
+        
+        if moved:
+            # Add to trash bin and remove from files database in one transaction
+            expires_at = datetime.now() + TRASH_RETENTION
+            db.session.bulk_save_objects([
+                TrashBin(original_path=file_record.path, original_size=file_record.size, expires_at=expires_at)
+                for file_record in moved
+            ])
+            FileRecord.query.filter(
+                FileRecord.id.in_([file_record.id for file_record in moved])
+            ).delete(synchronize_session=False)
+            db.session.commit()
+            count_cache.pop(('trash',), None)
+        
+        logger.info(f"Bulk delete moved {len(moved)} items to trash, queued {len(queued)}, {len(failed)} failed")
+        return jsonify({
+            'deleted': len(moved),
+            'queued': queued,
+            'failed': failed,
+            'not_found': [file_id for file_id in ids if file_id not in found_ids]
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in bulk_delete_files: {e}")
+        db.session.rollback()
+        return jsonify({'error': 'Failed to delete files'}), 500
+
+@cache_result(duration=3600)
+def get_scan_breakdown(scan_id):
+    """Get the top file types and media file count for a scan"""
+    # Completed scans have their aggregates stored in ScanStatistics - the top 10 is read
+    # straight off the (scan_id, stat_type, total_size) index
+    top_extensions = db.session.query(
+        ScanStatistics.key, ScanStatistics.count, ScanStatistics.total_size
+    ).filter(
+        ScanStatistics.scan_id == scan_id,
+        ScanStatistics.stat_type == 'extension'
+    ).order_by(ScanStatistics.total_size.desc()).limit(10).all()
+    media_files = db.session.query(func.sum(ScanStatistics.count)).filter(
+        ScanStatistics.scan_id == scan_id,
+        ScanStatistics.stat_type == 'media_type'
+    ).scalar()
+    if top_extensions or media_files is not None:
+        return [{
+            'extension': stat.key,
+            'count': stat.count,
+            'total_size': stat.total_size,
+            'total_size_formatted': format_size(stat.total_size)
+        } for stat in top_extensions], media_files or 0
+    
+    # Get top file types
+    top_extensions = db.session.query(
+        FileRecord.extension,
+        func.count(FileRecord.id).label('count'),
+        func.sum(FileRecord.size).label('total_size')
+    ).filter(
+        FileRecord.extension.isnot(None),
+        FileRecord.is_directory == False,
+        FileRecord.scan_id == scan_id
+    ).group_by(FileRecord.extension).order_by(
+        desc(func.sum(FileRecord.size))
+    ).limit(10).all()
+    
+    # Get media breakdown
+    media_files = MediaFile.query.join(FileRecord, MediaFile.file_id == FileRecord.id).filter(
+        FileRecord.scan_id == scan_id
+    ).count()
+    
+    return [{
+        'extension': ext.extension,
+        'count': ext.count,
+        'total_size': ext.total_size,
+        'total_size_formatted': format_size(ext.total_size)
+    } for ext in top_extensions], media_files
+
 @app.route('/api/analytics/overview')
 @retry_on_db_lock(max_retries=3, delay=2)
 def get_analytics_overview():
@@ -2258,35 +3014,18 @@ def get_analytics_overview():
         total_directories = latest_scan.total_directories or 0
         total_size = latest_scan.total_size or 0
         
-        # Get top file types
-        top_extensions = db.session.query(
-            FileRecord.extension,
-            func.count(FileRecord.id).label('count'),
-            func.sum(FileRecord.size).label('total_size')
-        ).filter(
-            FileRecord.extension.isnot(None),
-            FileRecord.is_directory == False,
-            FileRecord.scan_id == latest_scan.id
-        ).group_by(FileRecord.extension).order_by(
-            desc(func.sum(FileRecord.size))
-        ).limit(10).all()
-        
-        # Get media breakdown
-        media_files = MediaFile.query.join(FileRecord, MediaFile.file_id == FileRecord.id).filter(
-            FileRecord.scan_id == latest_scan.id
-        ).count()
+        # A finished scan's breakdown never changes, so serve it from the cache; a running scan is still growing
+        if latest_scan.status == 'running':
+            top_extensions, media_files = get_scan_breakdown.__wrapped__(latest_scan.id)
+        else:
+            top_extensions, media_files = get_scan_breakdown(latest_scan.id)
         
         return jsonify({
             'total_files': total_files,
             'total_directories': total_directories,
             'total_size': total_size,
             'total_size_formatted': format_size(total_size),
-            'top_extensions': [{
-                'extension': ext.extension,
-                'count': ext.count,
-                'total_size': ext.total_size,
-                'total_size_formatted': format_size(ext.total_size)
-            } for ext in top_extensions],
+            'top_extensions': top_extensions,
             'media_files': media_files
         })
     except Exception as e:
@@ -2348,13 +3087,13 @@ def get_analytics_stats():
                 'size_formatted': format_size(int(size_per_week))
             },
             'last_scan': {
-                'date': latest_scan.start_time.isoformat(),
+                'date': latest_scan.start_time,
                 'files': latest_scan.total_files,
                 'size': latest_scan.total_size,
                 'size_formatted': format_size(latest_scan.total_size)
             },
             'first_scan': {
-                'date': completed_scans[-1].start_time.isoformat(),
+                'date': completed_scans[-1].start_time,
                 'files': completed_scans[-1].total_files,
                 'size': completed_scans[-1].total_size,
                 'size_formatted': format_size(completed_scans[-1].total_size)
@@ -2365,6 +3104,7 @@ def get_analytics_stats():
         return jsonify({'error': 'Failed to get analytics stats'}), 500
 
 @app.route('/api/analytics/history')
+@cache_response(('days',))
 def get_storage_history():
     """Get storage usage history from all completed scans with enhanced timing info"""
     try:
@@ -2372,26 +3112,36 @@ def get_storage_history():
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         
-        # Get data from StorageHistory table (if any)
-        storage_history = StorageHistory.query.filter(
+        # The history has one point per day, so bucket by day in SQL and return one row per day.
+        # SQLite fills the bare columns of a MAX()/MIN() aggregate from the row holding that value -
+        # the day's last StorageHistory record and its first completed scan, as the merge below expects
+        history_day = func.date(StorageHistory.date)
+        storage_history = db.session.query(
+            func.max(StorageHistory.date).label('date'),
+            StorageHistory.total_size, StorageHistory.file_count, StorageHistory.directory_count
+        ).filter(
             StorageHistory.date >= start_date,
             StorageHistory.date <= end_date
-        ).order_by(StorageHistory.date).all()
+        ).group_by(history_day).order_by(history_day).all()
         
         # Get data from completed scans
-        completed_scans = ScanRecord.query.filter(
+        scan_day = func.date(ScanRecord.start_time)
+        completed_scans = db.session.query(
+            func.min(ScanRecord.start_time).label('start_time'), ScanRecord.end_time, ScanRecord.status,
+            ScanRecord.total_size, ScanRecord.total_files, ScanRecord.total_directories
+        ).filter(
             ScanRecord.status == 'completed',
             ScanRecord.start_time >= start_date,
             ScanRecord.start_time <= end_date
-        ).order_by(ScanRecord.start_time).all()
+        ).group_by(scan_day).order_by(scan_day).all()
         
         # Combine both sources, prioritizing StorageHistory if available
         history_data = {}
         
-        # Add StorageHistory data
+        # Add StorageHistory data - datetimes go out raw, the JSON provider writes them as ISO 8601
         for record in storage_history:
             history_data[record.date.date()] = {
-                'date': record.date.isoformat(),
+                'date': record.date,
                 'total_size': record.total_size,
                 'total_size_formatted': format_size(record.total_size),
                 'file_count': record.file_count,
@@ -2411,9 +3161,9 @@ def get_storage_history():
                     duration = f"{hours}:{minutes:02d}:{seconds:02d}"
                 
                 history_data[scan_date] = {
-                    'date': scan.start_time.isoformat(),
-                    'start_time': scan.start_time.isoformat(),
-                    'end_time': scan.end_time.isoformat() if scan.end_time else None,
+                    'date': scan.start_time,
+                    'start_time': scan.start_time,
+                    'end_time': scan.end_time,
                     'duration': duration,
                     'total_size': scan.total_size,
                     'total_size_formatted': format_size(scan.total_size),
@@ -2437,15 +3187,20 @@ def get_media_files():
     """Get media files with filtering"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
+        per_page = get_per_page(50)
         media_type = request.args.get('type', '')
         resolution = request.args.get('resolution', '')
         search = request.args.get('search', '')
+        skip_count = request.args.get('skip_count', '') == '1'
         
         # Always get the most recent scan regardless of status
         latest_scan = db.session.query(ScanRecord).order_by(ScanRecord.start_time.desc()).first()
 
-        query = MediaFile.query
+        # Select just the serialized columns - plain rows, no ORM instances or identity map
+        query = MediaFile.query.with_entities(
+            MediaFile.id, MediaFile.file_id, MediaFile.title, MediaFile.year, MediaFile.media_type,
+            MediaFile.resolution, MediaFile.video_codec, MediaFile.audio_codec, MediaFile.runtime, MediaFile.file_format
+        )
         
         # Apply filters
         if media_type and media_type != 'all':
@@ -2453,14 +3208,13 @@ def get_media_files():
         if resolution and resolution != 'all':
             query = query.filter(MediaFile.resolution == resolution)
         if search:
-            query = query.filter(
-                db.or_(
-                    MediaFile.title.ilike(f'%{search}%'),
-                    MediaFile.episode_title.ilike(f'%{search}%')
-                )
-            )
+            query = query.filter(media_search_filter(search, latest_scan.id if latest_scan else None))
         
-        media_files = query.paginate(page=page, per_page=per_page, error_out=False)
+        media_files = paginate_fast(
+            query, page, per_page,
+            ('media_files', latest_scan.id if latest_scan else None, media_type, resolution, search),
+            skip_count=skip_count
+        )
         
         # Get counts by media type
         media_counts = db.session.query(
@@ -2476,6 +3230,14 @@ def get_media_files():
         for media_type, count in media_counts:
             counts[media_type] = count
         
+        # Load the backing file rows for the whole page in one query instead of several lookups per media file
+        file_ids = [media.file_id for media in media_files.items if media.file_id]
+        files_by_id = {
+            file.id: file for file in db.session.query(
+                FileRecord.id, FileRecord.path, FileRecord.name, FileRecord.size
+            ).filter(FileRecord.id.in_(file_ids))
+        } if file_ids else {}
+        
         return jsonify({
             'media_files': [{
                 'id': media.id,
@@ -2487,14 +3249,15 @@ def get_media_files():
                 'audio_codec': media.audio_codec,
                 'runtime': media.runtime,
                 'file_format': media.file_format,
-                'size': media.file_id and FileRecord.query.get(media.file_id).size or 0,
-                'size_formatted': media.file_id and format_size(FileRecord.query.get(media.file_id).size) or '0 B',
-                'path': media.file_id and FileRecord.query.get(media.file_id).path or '',
-                'name': media.file_id and FileRecord.query.get(media.file_id).name or media.title
-            } for media in media_files.items],
+                'size': file.size if file else 0,
+                'size_formatted': format_size(file.size) if file else '0 B',
+                'path': file.path if file else '',
+                'name': file.name if file else media.title
+            } for media, file in ((media, files_by_id.get(media.file_id)) for media in media_files.items)],
             'total': media_files.total,
             'pages': media_files.pages,
             'current_page': media_files.page,
+            'has_next': media_files.has_next,
             'counts': counts
         })
     except Exception as e:
@@ -2515,18 +3278,28 @@ def delete_file(file_id):
         )
         
         # Move file to trash directory
-        trash_dir = '/app/data/trash'
-        os.makedirs(trash_dir, exist_ok=True)
+        trash_path = os.path.join(TRASH_DIR, f"{file_record.id}_{file_record.name}")
         
-        trash_path = os.path.join(trash_dir, f"{file_record.id}_{file_record.name}")
+        def record_trashed_file():
+            db.session.add(TrashBin(
+                original_path=trash_path,
+                original_size=trash_entry.original_size,
+                expires_at=trash_entry.expires_at
+            ))
         
-        if os.path.exists(file_record.path):
-            shutil.move(file_record.path, trash_path)
+        # Attempt the move directly - an exists() check first costs an extra stat and races with the move
+        try:
+            job_id = move_to_trash(file_record.id, file_record.path, trash_path, record_trashed_file)
+            if job_id is not None:
+                return jsonify({'message': 'Moving file to trash', 'job_id': job_id, 'status': 'queued'}), 202
             trash_entry.original_path = trash_path
+        except FileNotFoundError:
+            logger.warning(f"File already missing from disk: {file_record.path}")
         
         # Save to database
         db.session.add(trash_entry)
         db.session.commit()
+        count_cache.pop(('trash',), None)
         
         return jsonify({'message': 'File moved to trash successfully'})
     except Exception as e:
@@ -2534,15 +3307,20 @@ def delete_file(file_id):
         return jsonify({'error': 'Failed to delete file'}), 500
 
 @app.route('/api/trash')
+@cache_response(('page', 'per_page', 'skip_count'))
 def get_trash_bin():
     """Get trash bin contents"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 50, type=int)
-        
-        trash_items = TrashBin.query.filter_by(restored=False).order_by(
-            desc(TrashBin.deleted_time)
-        ).paginate(page=page, per_page=per_page, error_out=False)
+        per_page = get_per_page(50)
+        skip_count = request.args.get('skip_count', '') == '1'
+        
+        trash_items = paginate_fast(
+            TrashBin.query.with_entities(
+                TrashBin.id, TrashBin.original_path, TrashBin.original_size, TrashBin.deleted_time, TrashBin.expires_at
+            ).filter(TrashBin.restored == False).order_by(desc(TrashBin.deleted_time)),
+            page, per_page, ('trash',), skip_count=skip_count
+        )
         
         return jsonify({
             'trash_items': [{
@@ -2550,12 +3328,13 @@ def get_trash_bin():
                 'original_path': item.original_path,
                 'original_size': item.original_size,
                 'original_size_formatted': format_size(item.original_size),
-                'deleted_time': item.deleted_time.isoformat(),
-                'expires_at': item.expires_at.isoformat() if item.expires_at else None
+                'deleted_time': item.deleted_time,
+                'expires_at': item.expires_at
             } for item in trash_items.items],
             'total': trash_items.total,
             'pages': trash_items.pages,
-            'current_page': trash_items.page
+            'current_page': trash_items.page,
+            'has_next': trash_items.has_next
         })
     except Exception as e:
         logger.error(f"Error getting trash bin: {e}")
@@ -2578,7 +3357,7 @@ def get_logs():
                 current_scan = {
                     'status': 'scanning',
                     'scan_id': scanner_state['current_scan_id'],
-                    'start_time': scanner_state['start_time'].isoformat() if scanner_state['start_time'] else None,
+                    'start_time': scanner_state['start_time'],
                     'total_files': scanner_state['total_files'],
                     'total_directories': scanner_state['total_directories'],
                     'total_size': scanner_state['total_size'],
@@ -2590,7 +3369,7 @@ def get_logs():
                 current_scan = {
                     'status': 'scanning',
                     'scan_id': running_scan.id,
-                    'start_time': running_scan.start_time.isoformat() if running_scan.start_time else None,
+                    'start_time': running_scan.start_time,
                     'total_files': running_scan.total_files or 0,
                     'total_directories': running_scan.total_directories or 0,
                     'total_size': running_scan.total_size or 0,
@@ -2608,8 +3387,8 @@ def get_logs():
         for scan in recent_scans:
             scan_history.append({
                 'id': scan.id,
-                'start_time': scan.start_time.isoformat(),
-                'end_time': scan.end_time.isoformat() if scan.end_time else None,
+                'start_time': scan.start_time,
+                'end_time': scan.end_time,
                 'status': scan.status,
                 'total_files': scan.total_files,
                 'total_directories': scan.total_directories,
@@ -2618,70 +3397,71 @@ def get_logs():
                 'error_message': scan.error_message
             })
         
-        # Create detailed log entries
+        # Create detailed log entries - all stamped with the same time, formatted once
         logs = []
+        now_str = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
         # Add current scan status with more detail
         if current_scan:
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"=== SCAN IN PROGRESS ===",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - === SCAN IN PROGRESS ==="
+                'raw': f"{now_str} - INFO - === SCAN IN PROGRESS ==="
             })
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"Scan ID: {current_scan['scan_id']}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Scan ID: {current_scan['scan_id']}"
+                'raw': f"{now_str} - INFO - Scan ID: {current_scan['scan_id']}"
             })
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"Files processed: {current_scan['total_files']:,}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Files processed: {current_scan['total_files']:,}"
+                'raw': f"{now_str} - INFO - Files processed: {current_scan['total_files']:,}"
             })
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"Directories processed: {current_scan['total_directories']:,}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Directories processed: {current_scan['total_directories']:,}"
+                'raw': f"{now_str} - INFO - Directories processed: {current_scan['total_directories']:,}"
             })
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"Total size: {current_scan['total_size_formatted']}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Total size: {current_scan['total_size_formatted']}"
+                'raw': f"{now_str} - INFO - Total size: {current_scan['total_size_formatted']}"
             })
             if current_scan['current_path']:
                 logs.append({
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'timestamp': now_str,
                     'level': 'INFO',
                     'message': f"Current path: {current_scan['current_path']}",
-                    'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Current path: {current_scan['current_path']}"
+                    'raw': f"{now_str} - INFO - Current path: {current_scan['current_path']}"
                 })
             if current_scan['error']:
                 logs.append({
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'timestamp': now_str,
                     'level': 'ERROR',
                     'message': f"Scan error: {current_scan['error']}",
-                    'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - ERROR - Scan error: {current_scan['error']}"
+                    'raw': f"{now_str} - ERROR - Scan error: {current_scan['error']}"
                 })
         else:
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': 'No scan currently running',
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - No scan currently running"
+                'raw': f"{now_str} - INFO - No scan currently running"
             })
         
         # Add recent scan history with more detail
         if scan_history:
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"=== RECENT SCAN HISTORY ===",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - === RECENT SCAN HISTORY ==="
+                'raw': f"{now_str} - INFO - === RECENT SCAN HISTORY ==="
             })
             
             for scan in scan_history:
@@ -2717,49 +3497,49 @@ def get_logs():
                 folder_count = 0
                 file_count = 0
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"=== DATABASE STATUS ===",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - === DATABASE STATUS ==="
+                'raw': f"{now_str} - INFO - === DATABASE STATUS ==="
             })
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"Files in database: {file_count:,}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Files in database: {file_count:,}"
+                'raw': f"{now_str} - INFO - Files in database: {file_count:,}"
             })
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'INFO',
                 'message': f"Folders in database: {folder_count:,}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Folders in database: {folder_count:,}"
+                'raw': f"{now_str} - INFO - Folders in database: {folder_count:,}"
             })
         except Exception as e:
             logs.append({
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now_str,
                 'level': 'ERROR',
                 'message': f"Database status error: {e}",
-                'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - ERROR - Database status error: {e}"
+                'raw': f"{now_str} - ERROR - Database status error: {e}"
             })
         
         # Add application status
         logs.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': now_str,
             'level': 'INFO',
             'message': f"=== APPLICATION STATUS ===",
-            'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - === APPLICATION STATUS ==="
+            'raw': f"{now_str} - INFO - === APPLICATION STATUS ==="
         })
         logs.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': now_str,
             'level': 'INFO',
             'message': f"Application running. Recent scans: {len(scan_history)}",
-            'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - Application running. Recent scans: {len(scan_history)}"
+            'raw': f"{now_str} - INFO - Application running. Recent scans: {len(scan_history)}"
         })
         logs.append({
-            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'timestamp': now_str,
             'level': 'INFO',
             'message': f"For detailed system logs, use: docker logs <container_name>",
-            'raw': f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} - INFO - For detailed system logs, use: docker logs <container_name>"
+            'raw': f"{now_str} - INFO - For detailed system logs, use: docker logs <container_name>"
         })
         
         return jsonify({
@@ -2787,6 +3567,7 @@ def restore_file(item_id):
             # In a real implementation, you'd move it back
             trash_item.restored = True
             db.session.commit()
+            count_cache.pop(('trash',), None)
             
             return jsonify({'message': 'File restored successfully'})
         else:
@@ -2801,67 +3582,77 @@ def get_duplicates():
     """Get duplicate files grouped by hash"""
     try:
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        per_page = get_per_page(20)
+        skip_count = request.args.get('skip_count', '') == '1'
         
         # Get duplicate groups with file count and total size
-        duplicate_groups = db.session.query(
-            DuplicateGroup,
-            func.count(DuplicateFile.id).label('file_count'),
-            func.sum(FileRecord.size).label('total_size')
-        ).join(
-            DuplicateFile, DuplicateGroup.id == DuplicateFile.group_id
-        ).join(
-            FileRecord, DuplicateFile.file_id == FileRecord.id
-        ).group_by(
-            DuplicateGroup.id
-        ).order_by(
-            desc(func.sum(FileRecord.size))
-        ).paginate(page=page, per_page=per_page, error_out=False)
+        duplicate_groups = paginate_fast(
+            db.session.query(
+                DuplicateGroup.id, DuplicateGroup.hash_value, DuplicateGroup.size,
+                func.count(DuplicateFile.id).label('file_count'),
+                func.sum(FileRecord.size).label('total_size')
+            ).join(
+                DuplicateFile, DuplicateGroup.id == DuplicateFile.group_id
+            ).join(
+                FileRecord, DuplicateFile.file_id == FileRecord.id
+            ).group_by(
+                DuplicateGroup.id
+            ).order_by(
+                desc(func.sum(FileRecord.size))
+            ),
+            page, per_page, ('duplicates',), skip_count=skip_count,
+            count_query=db.session.query(func.count(func.distinct(DuplicateFile.group_id))).join(
+                FileRecord, DuplicateFile.file_id == FileRecord.id
+            )
+        )
         
-        result = []
-        for group, file_count, total_size in duplicate_groups.items:
-            # Get individual files in this group
+        # Files of every group on the page in one query instead of one query per group
+        group_files = {group.id: [] for group in duplicate_groups.items}
+        if group_files:
             files = db.session.query(
-                FileRecord, DuplicateFile
+                DuplicateFile.group_id, DuplicateFile.is_primary, DuplicateFile.is_deleted,
+                FileRecord.id, FileRecord.name, FileRecord.path, FileRecord.size
             ).join(
-                DuplicateFile, FileRecord.id == DuplicateFile.file_id
+                FileRecord, FileRecord.id == DuplicateFile.file_id
             ).filter(
-                DuplicateFile.group_id == group.id
+                DuplicateFile.group_id.in_(list(group_files))
             ).all()
             
-            group_files = []
-            for file_record, duplicate_file in files:
-                group_files.append({
-                    'id': file_record.id,
-                    'name': file_record.name,
-                    'path': file_record.path,
-                    'size': file_record.size,
-                    'size_formatted': format_size(file_record.size),
-                    'is_primary': duplicate_file.is_primary,
-                    'is_deleted': duplicate_file.is_deleted
+            for file in files:
+                group_files[file.group_id].append({
+                    'id': file.id,
+                    'name': file.name,
+                    'path': file.path,
+                    'size': file.size,
+                    'size_formatted': format_size(file.size),
+                    'is_primary': file.is_primary,
+                    'is_deleted': file.is_deleted
                 })
-            
+        
+        result = []
+        for group in duplicate_groups.items:
             result.append({
                 'id': group.id,
                 'hash': group.hash_value,
                 'size': group.size,
                 'size_formatted': format_size(group.size),
-                'file_count': file_count,
-                'total_size': total_size,
-                'total_size_formatted': format_size(total_size),
-                'files': group_files
+                'file_count': group.file_count,
+                'total_size': group.total_size,
+                'total_size_formatted': format_size(group.total_size),
+                'files': group_files[group.id]
             })
         
         return jsonify({
             'duplicates': result,
             'total': duplicate_groups.total,
             'pages': duplicate_groups.pages,
-            'current_page': duplicate_groups.page
+            'current_page': duplicate_groups.page,
+            'has_next': duplicate_groups.has_next
         })
     except Exception as e:
         logger.error(f"Error getting duplicates: {e}")
         # Try to unlock database if it's locked
-        if "database is locked" in str(e).lower():
+        if is_database_locked(e):
             unlock_database()
         return jsonify({'error': 'Failed to get duplicates'}), 500
 
@@ -2902,23 +3693,34 @@ def delete_duplicate_file(group_id, file_id):
         trash_entry = TrashBin(
             original_path=file_record.path,
             original_size=file_record.size,
-            expires_at=datetime.now() + timedelta(days=30)  # 30 days
+            expires_at=datetime.now() + TRASH_RETENTION
         )
         
         # Move file to trash directory
-        trash_dir = '/app/data/trash'
-        os.makedirs(trash_dir, exist_ok=True)
+        trash_path = os.path.join(TRASH_DIR, f"{file_record.id}_{file_record.name}")
         
-        trash_path = os.path.join(trash_dir, f"{file_record.id}_{file_record.name}")
+        def record_deleted_duplicate():
+            db.session.add(TrashBin(
+                original_path=trash_path,
+                original_size=trash_entry.original_size,
+                expires_at=trash_entry.expires_at
+            ))
+            DuplicateFile.query.filter_by(group_id=group_id, file_id=file_id).update({'is_deleted': True})
         
-        if os.path.exists(file_record.path):
-            shutil.move(file_record.path, trash_path)
+        # Attempt the move directly - an exists() check first costs an extra stat and races with the move
+        try:
+            job_id = move_to_trash(file_record.id, file_record.path, trash_path, record_deleted_duplicate)
+            if job_id is not None:
+                return jsonify({'message': 'Moving duplicate file to trash', 'job_id': job_id, 'status': 'queued'}), 202
             trash_entry.original_path = trash_path
+        except FileNotFoundError:
+            logger.warning(f"Duplicate file already missing from disk: {file_record.path}")
         
         # Mark as deleted in database
         duplicate_file.is_deleted = True
         db.session.add(trash_entry)
         db.session.commit()
+        count_cache.pop(('trash',), None)
         
         return jsonify({'message': 'Duplicate file deleted successfully'})
     except Exception as e:
@@ -2944,8 +3746,8 @@ def debug_folder_info():
             result['all_recent_scans'].append({
                 'id': scan.id,
                 'status': scan.status,
-                'start_time': scan.start_time.isoformat() if scan.start_time else None,
-                'end_time': scan.end_time.isoformat() if scan.end_time else None,
+                'start_time': scan.start_time,
+                'end_time': scan.end_time,
                 'total_files': scan.total_files,
                 'total_directories': scan.total_directories
             })
@@ -2959,31 +3761,41 @@ def debug_folder_info():
             result['latest_completed_scan'] = {
                 'id': latest_scan.id,
                 'status': latest_scan.status,
-                'start_time': latest_scan.start_time.isoformat() if latest_scan.start_time else None,
-                'end_time': latest_scan.end_time.isoformat() if latest_scan.end_time else None
+                'start_time': latest_scan.start_time,
+                'end_time': latest_scan.end_time
             }
             
-            # Get all FolderInfo records for this scan
-            folder_infos = db.session.query(FolderInfo).filter_by(
-                scan_id=latest_scan.id
-            ).order_by(FolderInfo.depth, FolderInfo.total_size.desc()).all()
+            # Stream FolderInfo rows for this scan instead of materializing them all
+            folder_rows = db.session.execute(
+                select(
+                    FolderInfo.depth,
+                    FolderInfo.total_size,
+                    FolderInfo.path,
+                    FolderInfo.name,
+                    FolderInfo.file_count
+                ).filter_by(scan_id=latest_scan.id).execution_options(yield_per=1000)
+            )
+            
+            # Group by depth and keep the 10 largest depth=1 folders in a single pass
+            depth_breakdown = Counter()
+            
+            def depth_1_folders():
+                for folder in folder_rows:
+                    depth_breakdown[folder.depth] += 1
+                    if folder.depth == 1:
+                        yield folder
+            
+            top_depth_1 = heapq.nlargest(10, depth_1_folders(), key=lambda f: f.total_size or 0)
             
             result['folder_info_data'] = {
-                'total_folder_records': len(folder_infos),
-                'depth_1_count': len([f for f in folder_infos if f.depth == 1]),
-                'depth_breakdown': {},
+                'total_folder_records': sum(depth_breakdown.values()),
+                'depth_1_count': depth_breakdown[1],
+                'depth_breakdown': dict(depth_breakdown),
                 'top_10_depth_1': []
             }
             
-            # Group by depth
-            for folder in folder_infos:
-                if folder.depth not in result['folder_info_data']['depth_breakdown']:
-                    result['folder_info_data']['depth_breakdown'][folder.depth] = 0
-                result['folder_info_data']['depth_breakdown'][folder.depth] += 1
-            
             # Get top 10 depth=1 folders
-            depth_1_folders = [f for f in folder_infos if f.depth == 1][:10]
-            for folder in depth_1_folders:
+            for folder in top_depth_1:
                 result['folder_info_data']['top_10_depth_1'].append({
                     'path': folder.path,
                     'name': folder.name,
@@ -3003,7 +3815,7 @@ def debug_folder_info():
 def debug_file_records():
     """Debug endpoint to check FileRecord data structure"""
     try:
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         
         # Get latest scan
         latest_scan = db.session.query(ScanRecord).order_by(ScanRecord.start_time.desc()).first()
@@ -3032,7 +3844,7 @@ def debug_file_records():
         
         # Also check for any directories that start with data_path
         data_path_dirs = db.session.query(FileRecord).filter(
-            FileRecord.path.like(f"{data_path}/%"),
+            path_under(FileRecord.path, data_path),
             FileRecord.is_directory == True,
             FileRecord.scan_id == latest_scan.id
         ).limit(10).all()
@@ -3061,10 +3873,18 @@ def debug_file_records():
 def debug_directory_totals():
     """Debug endpoint to check DirectoryTotal table contents"""
     try:
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         
-        # Get all folder info
-        totals = FolderInfo.query.all()
+        # Count with SELECT COUNT(*) and only hydrate the ten sample rows
+        total_records = FolderInfo.query.count()
+        totals = FolderInfo.query.with_entities(
+            FolderInfo.path,
+            FolderInfo.name,
+            FolderInfo.total_size,
+            FolderInfo.file_count,
+            FolderInfo.depth,
+            FolderInfo.scan_id
+        ).limit(10).all()
         
         # Get latest scan
         latest_scan = ScanRecord.query.filter(
@@ -3079,7 +3899,7 @@ def debug_directory_totals():
         
         return jsonify({
             'data_path': data_path,
-            'total_records': len(totals),
+            'total_records': total_records,
             'latest_scan_id': latest_scan.id if latest_scan else None,
             'sample_totals': [
                 {
@@ -3089,7 +3909,7 @@ def debug_directory_totals():
                     'file_count': t.file_count,
                     'depth': t.depth,
                     'scan_id': t.scan_id
-                } for t in totals[:10]
+                } for t in totals
             ],
             'sample_directories': [
                 {
@@ -3108,7 +3928,7 @@ def debug_directory_totals():
 def manual_calculate_totals():
     """Manually trigger directory totals calculation for debugging"""
     try:
-        data_path = get_setting('data_path', os.environ.get('DATA_PATH', '/data'))
+        data_path = get_setting('data_path', DEFAULT_DATA_PATH)
         
         # Get the latest completed scan
         latest_scan = ScanRecord.query.filter(
@@ -3189,25 +4009,29 @@ def get_folder_info_by_path(folder_path):
         if not latest_scan:
             return jsonify({'error': 'No completed scan found'}), 404
         
-        # Get folder info from database
-        folder_info = FolderInfo.query.filter(
-            FolderInfo.path == folder_path,
-            FolderInfo.scan_id == latest_scan.id
+        # Get folder info from database - select only the scalar columns, no ORM instance
+        folder_info = db.session.execute(
+            select(
+                FolderInfo.path,
+                FolderInfo.name,
+                FolderInfo.parent_path,
+                FolderInfo.total_size,
+                FolderInfo.file_count,
+                FolderInfo.directory_count,
+                FolderInfo.direct_file_count,
+                FolderInfo.direct_directory_count,
+                FolderInfo.depth,
+                FolderInfo.scan_id
+            ).where(
+                FolderInfo.path == folder_path,
+                FolderInfo.scan_id == latest_scan.id
+            )
         ).first()
         
         if folder_info:
             return jsonify({
-                'path': folder_info.path,
-                'name': folder_info.name,
-                'parent_path': folder_info.parent_path,
-                'total_size': folder_info.total_size,
-                'total_size_formatted': format_size(folder_info.total_size),
-                'file_count': folder_info.file_count,
-                'directory_count': folder_info.directory_count,
-                'direct_file_count': folder_info.direct_file_count,
-                'direct_directory_count': folder_info.direct_directory_count,
-                'depth': folder_info.depth,
-                'scan_id': folder_info.scan_id
+                **folder_info._mapping,
+                'total_size_formatted': format_size(folder_info.total_size)
             })
         else:
             # Fallback: calculate on-the-fly
@@ -3216,7 +4040,7 @@ def get_folder_info_by_path(folder_path):
                 func.count(FileRecord.id).label('file_count'),
                 func.count(case((FileRecord.is_directory == True, 1), else_=None)).label('directory_count')
             ).filter(
-                FileRecord.path.like(f"{folder_path}/%"),
+                path_under(FileRecord.path, folder_path),
                 FileRecord.scan_id == latest_scan.id
             ).first()
             
@@ -3290,7 +4114,7 @@ def get_folder_children_by_path(folder_path):
                         func.sum(FileRecord.size).label('total_size'),
                         func.count(FileRecord.id).label('file_count')
                     ).filter(
-                        FileRecord.path.like(f"{child.path}/%"),
+                        path_under(FileRecord.path, child.path),
                         FileRecord.scan_id == latest_scan.id
                     ).first()
                     
@@ -3313,7 +4137,7 @@ def get_folder_children_by_path(folder_path):
                     'size': child.size,
                     'size_formatted': format_size(child.size),
                     'extension': child.extension,
-                    'modified_time': child.modified_time.isoformat() if child.modified_time else None,
+                    'modified_time': child.modified_time,
                     'is_directory': False
                 })
         
@@ -3369,6 +4193,8 @@ if __name__ == '__main__':
             except Exception as e:
                 logger.warning(f"Could not create indexes: {e}")
             
+            os.makedirs(TRASH_DIR, exist_ok=True)
+            
             # Initialize default settings if they don't exist
             if not get_setting('scan_time'):
                 set_setting('scan_time', '01:00')
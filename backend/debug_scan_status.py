@@ -21,6 +21,7 @@ def debug_scan_status():
     try:
         # Connect to database
         conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
         print("=== SCAN STATUS DEBUG ===")
@@ -35,70 +36,78 @@ def debug_scan_status():
             LIMIT 5
         """)
         
-        scans = cursor.fetchall()
-        print(f"Found {len(scans)} scan records:")
-        
-        for scan in scans:
-            scan_id, status, start_time, end_time, total_files, total_directories, total_size, error_message = scan
-            print(f"  Scan {scan_id}: {status}")
-            print(f"    Start: {start_time}")
-            print(f"    End: {end_time}")
-            print(f"    Files: {total_files:,}")
-            print(f"    Directories: {total_directories:,}")
-            print(f"    Size: {total_size:,} bytes")
-            if error_message:
-                print(f"    Error: {error_message}")
+        # Iterate the cursor directly - rows are addressed by column name
+        print("Latest scan records:")
+        scan_count = 0
+        for scan in cursor:
+            scan_count += 1
+            print(f"  Scan {scan['id']}: {scan['status']}")
+            print(f"    Start: {scan['start_time']}")
+            print(f"    End: {scan['end_time']}")
+            print(f"    Files: {scan['total_files']:,}")
+            print(f"    Directories: {scan['total_directories']:,}")
+            print(f"    Size: {scan['total_size']:,} bytes")
+            if scan['error_message']:
+                print(f"    Error: {scan['error_message']}")
             print()
+        print(f"Found {scan_count} scan records")
         
-        # Check for running scans
-        cursor.execute("SELECT COUNT(*) FROM scan_records WHERE status = 'running'")
-        running_count = cursor.fetchone()[0]
+        # Look up which optional tables exist once instead of probing sqlite_master per table
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type='table' AND name IN ('scanner_state', 'folder_info')
+        """)
+        tables = {row[0] for row in cursor.fetchall()}
+        
+        # Fetch all scalar counts in a single statement
+        cursor.execute(f"""
+            SELECT (SELECT COUNT(*) FROM files),
+                   {'(SELECT COUNT(*) FROM folder_info)' if 'folder_info' in tables else 'NULL'}
+        """)
+        file_count, folder_count = cursor.fetchone()
+        
+        # Check for running scans - the count falls out of the detail rows
+        cursor.execute("""
+            SELECT id, start_time, total_files, total_directories, total_size
+            FROM scan_records 
+            WHERE status = 'running'
+        """)
+        running_scans = cursor.fetchall()
+        running_count = len(running_scans)
         print(f"Running scans: {running_count}")
         
         if running_count > 0:
-            cursor.execute("""
-                SELECT id, start_time, total_files, total_directories, total_size
-                FROM scan_records 
-                WHERE status = 'running'
-            """)
-            running_scans = cursor.fetchall()
-            
             for scan in running_scans:
-                scan_id, start_time, total_files, total_directories, total_size = scan
-                print(f"  Running scan {scan_id}:")
+                start_time = scan['start_time']
+                print(f"  Running scan {scan['id']}:")
                 print(f"    Started: {start_time}")
-                print(f"    Files: {total_files:,}")
-                print(f"    Directories: {total_directories:,}")
-                print(f"    Size: {total_size:,} bytes")
+                print(f"    Files: {scan['total_files']:,}")
+                print(f"    Directories: {scan['total_directories']:,}")
+                print(f"    Size: {scan['total_size']:,} bytes")
                 
                 # Calculate duration
                 if start_time:
-                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+                    # fromisoformat accepts a trailing 'Z' since Python 3.11 - no string rewrite needed
+                    start_dt = datetime.fromisoformat(start_time)
                     elapsed = datetime.now() - start_dt.replace(tzinfo=None)
                     print(f"    Duration: {elapsed}")
                 print()
         
         # Check scanner state table
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='scanner_state'")
-        if cursor.fetchone():
+        if 'scanner_state' in tables:
             cursor.execute("SELECT * FROM scanner_state")
             scanner_state = cursor.fetchall()
             print(f"Scanner state table entries: {len(scanner_state)}")
             for state in scanner_state:
-                print(f"  {state}")
+                print(f"  {tuple(state)}")
         else:
             print("No scanner_state table found")
         
         # Check file records
-        cursor.execute("SELECT COUNT(*) FROM files")
-        file_count = cursor.fetchone()[0]
         print(f"Total file records: {file_count:,}")
         
         # Check folder info
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='folder_info'")
-        if cursor.fetchone():
-            cursor.execute("SELECT COUNT(*) FROM folder_info")
-            folder_count = cursor.fetchone()[0]
+        if folder_count is not None:
             print(f"Total folder info records: {folder_count:,}")
         else:
             print("No folder_info table found")
@@ -17,10 +17,23 @@ from datetime import datetime
 # Database path
 DB_PATH = '/app/data/storage_analyzer.db'
 
-def check_database_status():
+# Bind datetimes directly, stored as naive UTC in the same 'YYYY-MM-DD HH:MM:SS.ffffff' form SQLAlchemy writes,
+# so values from this script sort and parse like the ones the app stores
+sqlite3.register_adapter(datetime, lambda d: d.strftime('%Y-%m-%d %H:%M:%S.%f'))
+
+# Target PRAGMA values as SQLite reports them back (synchronous 1=NORMAL, temp_store 2=MEMORY)
+OPTIMAL_PRAGMAS = {
+    'busy_timeout': (30000, "PRAGMA busy_timeout=30000"),
+    'journal_mode': ('wal', "PRAGMA journal_mode=WAL"),
+    'synchronous': (1, "PRAGMA synchronous=NORMAL"),
+    'mmap_size': (268435456, "PRAGMA mmap_size=268435456"),
+    'cache_size': (10000, "PRAGMA cache_size=10000"),
+    'temp_store': (2, "PRAGMA temp_store=MEMORY"),
+}
+
+def check_database_status(conn):
     """Check if database is accessible and get status"""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=30)
         cursor = conn.cursor()
         
         # Check if database is accessible
@@ -31,15 +44,13 @@ def check_database_status():
         cursor.execute("SELECT COUNT(*) FROM scans WHERE status = 'running'")
         running_scans = cursor.fetchone()[0]
         
-        # Check WAL mode
-        cursor.execute("PRAGMA journal_mode")
-        journal_mode = cursor.fetchone()[0]
-        
-        # Check busy timeout
-        cursor.execute("PRAGMA busy_timeout")
-        busy_timeout = cursor.fetchone()[0]
-        
-        conn.close()
+        # Read current PRAGMA values so unlock_database can skip the ones already set
+        pragmas = {}
+        for name in OPTIMAL_PRAGMAS:
+            cursor.execute(f"PRAGMA {name}")
+            pragmas[name] = cursor.fetchone()[0]
+        journal_mode = pragmas['journal_mode']
+        busy_timeout = pragmas['busy_timeout']
         
         print(f"Database Status:")
         print(f"  - Accessible: Yes")
@@ -48,73 +59,72 @@ def check_database_status():
         print(f"  - Journal mode: {journal_mode}")
         print(f"  - Busy timeout: {busy_timeout}ms")
         
-        return True, running_scans
+        return True, running_scans, pragmas
         
     except sqlite3.OperationalError as e:
-        if "database is locked" in str(e).lower():
+        if e.args and "database is locked" in e.args[0]:
             print(f"Database is locked: {e}")
-            return False, 0
+            return False, 0, {}
         else:
             print(f"Database error: {e}")
-            return False, 0
+            return False, 0, {}
     except Exception as e:
         print(f"Error checking database: {e}")
-        return False, 0
+        return False, 0, {}
 
-def stop_running_scans():
+def stop_running_scans(conn):
     """Stop any running scans in the database"""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=30)
         cursor = conn.cursor()
         
-        # Get running scans
-        cursor.execute("SELECT id, start_time FROM scans WHERE status = 'running'")
-        running_scans = cursor.fetchall()
-        
-        if running_scans:
-            print(f"Found {len(running_scans)} running scans:")
-            for scan_id, start_time in running_scans:
-                print(f"  - Scan {scan_id} started at {start_time}")
-            
-            # Update running scans to stopped
+        # Stop running scans and collect them in one statement, inside one transaction
+        with conn:
             cursor.execute("""
                 UPDATE scans 
                 SET status = 'stopped', 
                     end_time = ?, 
                     error_message = 'Scan stopped by database fix script'
                 WHERE status = 'running'
-            """, (datetime.now().isoformat(),))
-            
-            conn.commit()
+                RETURNING id, start_time
+            """, (datetime.utcnow(),))
+            running_scans = cursor.fetchall()
+        
+        if running_scans:
+            print(f"Found {len(running_scans)} running scans:")
+            for scan_id, start_time in running_scans:
+                print(f"  - Scan {scan_id} started at {start_time}")
             print(f"Stopped {len(running_scans)} running scans")
         else:
             print("No running scans found")
         
-        conn.close()
         return True
         
     except Exception as e:
         print(f"Error stopping scans: {e}")
         return False
 
-def unlock_database():
-    """Attempt to unlock the database"""
+def unlock_database(conn, pragmas=None):
+    """Attempt to unlock the database, only re-issuing PRAGMAs that differ from pragmas"""
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=30)
         cursor = conn.cursor()
         
-        # Force a checkpoint to release locks
+        # Force a checkpoint to release locks - this script only unsticks locks,
+        # so skip the fsyncs for the checkpoint and restore NORMAL afterwards
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("PRAGMA wal_autocheckpoint=1000")
         cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
-        
-        # Set better timeout and WAL settings
-        cursor.execute("PRAGMA busy_timeout=30000")
-        cursor.execute("PRAGMA journal_mode=WAL")
-        cursor.execute("PRAGMA synchronous=NORMAL")
-        cursor.execute("PRAGMA cache_size=10000")
-        cursor.execute("PRAGMA temp_store=MEMORY")
+        # Finalize the checkpoint statement so it holds no read lock during the PRAGMA script
+        cursor.close()
         
         conn.commit()
-        conn.close()
+        
+        # Set better timeout and WAL settings - synchronous was just turned off, so always restore it
+        pragmas = dict(pragmas or {}, synchronous=None)
+        statements = [
+            statement for name, (value, statement) in OPTIMAL_PRAGMAS.items()
+            if pragmas.get(name) != value
+        ]
+        conn.executescript(";\n".join(statements) + ";")
         
         print("Database unlocked and optimized")
         return True
@@ -133,29 +143,34 @@ def main():
         print(f"Error: Database file not found at {DB_PATH}")
         sys.exit(1)
     
-    # Check initial status
-    print("1. Checking database status...")
-    accessible, running_scans = check_database_status()
-    
-    if not accessible:
-        print("\n2. Database is locked, attempting to unlock...")
-        if unlock_database():
-            print("Database unlocked successfully")
-        else:
-            print("Failed to unlock database")
-            sys.exit(1)
-    
-    # Stop running scans
-    print("\n3. Stopping any running scans...")
-    stop_running_scans()
-    
-    # Unlock database again
-    print("\n4. Optimizing database settings...")
-    unlock_database()
-    
-    # Final status check
-    print("\n5. Final status check...")
-    accessible, running_scans = check_database_status()
+    # Share one connection across all steps instead of reopening per helper
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    try:
+        # Check initial status
+        print("1. Checking database status...")
+        accessible, running_scans, pragmas = check_database_status(conn)
+        
+        if not accessible:
+            print("\n2. Database is locked, attempting to unlock...")
+            if unlock_database(conn, pragmas):
+                print("Database unlocked successfully")
+            else:
+                print("Failed to unlock database")
+                sys.exit(1)
+        
+        # Stop running scans
+        print("\n3. Stopping any running scans...")
+        stop_running_scans(conn)
+        
+        # Unlock database again
+        print("\n4. Optimizing database settings...")
+        unlock_database(conn, pragmas)
+        
+        # Final status check
+        print("\n5. Final status check...")
+        accessible, running_scans, pragmas = check_database_status(conn)
+    finally:
+        conn.close()
     
     if accessible and running_scans == 0:
         print("\n✅ Database is now accessible and no scans are running!")
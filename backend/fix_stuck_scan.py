@@ -7,8 +7,13 @@ import os
 import sys
 import sqlite3
 import time
+from contextlib import closing
 from datetime import datetime
 
+# Bind datetimes directly, stored as naive UTC in the same 'YYYY-MM-DD HH:MM:SS.ffffff' form SQLAlchemy writes,
+# so values from this script sort and parse like the ones the app stores
+sqlite3.register_adapter(datetime, lambda d: d.strftime('%Y-%m-%d %H:%M:%S.%f'))
+
 def fix_stuck_scan():
     """Stop the current scan and prepare for restart with optimized calculation"""
     
@@ -20,57 +25,63 @@ def fix_stuck_scan():
         return False
     
     try:
-        # Connect to database
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Check current scan status
-        cursor.execute("""
-            SELECT id, status, start_time, end_time 
-            FROM scan_records 
-            ORDER BY start_time DESC 
-            LIMIT 1
-        """)
-        
-        current_scan = cursor.fetchone()
-        
-        if not current_scan:
-            print("No scan records found")
-            return False
-        
-        scan_id, status, start_time, end_time = current_scan
-        
-        print(f"Current scan: ID={scan_id}, Status={status}, Start={start_time}")
-        
-        if status == 'in_progress':
-            print("Stopping current scan...")
-            
-            # Update scan status to failed
-            cursor.execute("""
-                UPDATE scan_records 
-                SET status = 'failed', 
-                    end_time = ?, 
-                    error_message = 'Stopped due to performance optimization'
-                WHERE id = ?
-            """, (datetime.now().isoformat(), scan_id))
-            
-            # Clear any partial folder calculations
-            cursor.execute("DELETE FROM folder_info WHERE scan_id = ?", (scan_id,))
-            
-            conn.commit()
-            print(f"Scan {scan_id} stopped and marked as failed")
-            
-        elif status == 'completed':
-            print("Last scan was completed successfully")
-            
-        elif status == 'failed':
-            print("Last scan failed, ready for restart")
+        # Connect to database - closing() guarantees the handle (and any lock) is released on error.
+        # isolation_level='IMMEDIATE' makes the fix take the write lock up front, so it runs atomically
+        with closing(sqlite3.connect(db_path, timeout=30, isolation_level='IMMEDIATE')) as conn:
+            conn.executescript("PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY;")
+            cursor = conn.cursor()
             
-        # Clear any scanner state
-        cursor.execute("DELETE FROM scanner_state")
-        conn.commit()
+            # All writes go into one transaction - a single commit instead of one per step
+            with conn:
+                # Stop the latest scan if it is still in progress - find and update it in one statement
+                cursor.execute("""
+                    UPDATE scan_records 
+                    SET status = 'failed', 
+                        end_time = ?, 
+                        error_message = 'Stopped due to performance optimization'
+                    WHERE id = (SELECT id FROM scan_records ORDER BY start_time DESC LIMIT 1)
+                      AND status = 'in_progress'
+                    RETURNING id, start_time
+                """, (datetime.utcnow(),))
+                stopped_scan = cursor.fetchone()
+                
+                if stopped_scan:
+                    scan_id, start_time = stopped_scan
+                    print(f"Current scan: ID={scan_id}, Status=in_progress, Start={start_time}")
+                    
+                    # Clear any partial folder calculations
+                    cursor.execute("DELETE FROM folder_info WHERE scan_id = ?", (scan_id,))
+                    
+                    print(f"Scan {scan_id} stopped and marked as failed")
+                else:
+                    # Nothing was stopped - report what the latest scan looks like
+                    cursor.execute("""
+                        SELECT id, status, start_time 
+                        FROM scan_records 
+                        ORDER BY start_time DESC 
+                        LIMIT 1
+                    """)
+                    current_scan = cursor.fetchone()
+                    
+                    if not current_scan:
+                        print("No scan records found")
+                        return False
+                    
+                    scan_id, status, start_time = current_scan
+                    
+                    print(f"Current scan: ID={scan_id}, Status={status}, Start={start_time}")
+                    
+                    if status == 'completed':
+                        print("Last scan was completed successfully")
+                        
+                    elif status == 'failed':
+                        print("Last scan failed, ready for restart")
+                    
+                # Clear any scanner state - only if the table exists, so a missing table can't roll back the fix above
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='scanner_state'")
+                if cursor.fetchone():
+                    cursor.execute("DELETE FROM scanner_state")
         
-        conn.close()
         print("Database cleaned up successfully")
         return True
         
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, Index
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, Text, Boolean, Index, ForeignKey, text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -12,7 +12,7 @@ class FileRecord(Base):
     id = Column(Integer, primary_key=True)
     path = Column(String(2000), nullable=False, unique=True)
     name = Column(String(500), nullable=False)
-    size = Column(Integer, nullable=False)  # Size in bytes
+    size = Column(BigInteger, nullable=False)  # Size in bytes
     is_directory = Column(Boolean, default=False)
     parent_path = Column(String(2000))
     extension = Column(String(50))
@@ -20,15 +20,22 @@ class FileRecord(Base):
     modified_time = Column(DateTime)
     accessed_time = Column(DateTime)
     permissions = Column(String(20))
-    scan_id = Column(Integer)
+    scan_id = Column(Integer, ForeignKey('scans.id', ondelete='CASCADE'))
     
     # Indexes for performance
     __table_args__ = (
         Index('idx_path', 'path'),
         Index('idx_parent_path', 'parent_path'),
-        Index('idx_extension', 'extension'),
-        Index('idx_size', 'size'),
+        # Sort column + id composites back keyset pagination; they also cover the old single-column lookups
+        Index('idx_extension_size_id', 'extension', 'size', 'id'),
+        Index('idx_size_id', 'size', 'id'),
+        Index('idx_name_id', 'name', 'id'),
+        Index('idx_modified_time_id', 'modified_time', 'id'),
         Index('idx_scan_id', 'scan_id'),
+        Index('idx_scan_id_parent_path', 'scan_id', 'parent_path'),
+        Index('idx_scan_id_path', 'scan_id', 'path'),
+        # Covering index for the per-extension size breakdown
+        Index('idx_scan_id_is_directory_extension_size', 'scan_id', 'is_directory', 'extension', 'size'),
     )
 
 class ScanRecord(Base):
@@ -40,14 +47,18 @@ class ScanRecord(Base):
     end_time = Column(DateTime)
     total_files = Column(Integer, default=0)
     total_directories = Column(Integer, default=0)
-    total_size = Column(Integer, default=0)  # Total size in bytes
+    total_size = Column(BigInteger, default=0)  # Total size in bytes
     status = Column(String(20), default='running')  # running, completed, failed
     error_message = Column(Text)
     
     # Indexes
     __table_args__ = (
         Index('idx_start_time', 'start_time'),
-        Index('idx_status', 'status'),
+        # status lookups use the leading column, and WHERE status=... ORDER BY start_time needs no sort
+        Index('idx_status_start_time', 'status', 'start_time'),
+        # Partial index covering only active scans - stays tiny however long the scan history grows.
+        # SQLite only uses it when the query repeats the exact predicate, hence '=' rather than IN (...)
+        Index('idx_running_scans', 'start_time', sqlite_where=text("status = 'running'")),
     )
 
 class MediaFile(Base):
@@ -55,7 +66,7 @@ class MediaFile(Base):
     __tablename__ = 'media_files'
     
     id = Column(Integer, primary_key=True)
-    file_id = Column(Integer)
+    file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'))
     media_type = Column(String(20))  # movie, tv_show, music, other
     title = Column(String(500))
     year = Column(Integer)
@@ -67,12 +78,14 @@ class MediaFile(Base):
     audio_codec = Column(String(50))
     audio_channels = Column(String(20))
     runtime = Column(Integer)  # Runtime in minutes
-    bitrate = Column(Integer)
+    bitrate = Column(BigInteger)
     frame_rate = Column(Float)
     file_format = Column(String(20))
     
     # Indexes
     __table_args__ = (
+        # Backs the ON DELETE CASCADE from files
+        Index('idx_media_files_file_id', 'file_id'),
         Index('idx_media_type', 'media_type'),
         Index('idx_title', 'title'),
         Index('idx_year', 'year'),
@@ -85,7 +98,7 @@ class DuplicateGroup(Base):
     
     id = Column(Integer, primary_key=True)
     hash_value = Column(String(64), nullable=False)
-    size = Column(Integer, nullable=False)
+    size = Column(BigInteger, nullable=False)
     file_count = Column(Integer, default=0)
     created_time = Column(DateTime, default=datetime.utcnow)
     
@@ -100,16 +113,17 @@ class DuplicateFile(Base):
     __tablename__ = 'duplicate_files'
     
     id = Column(Integer, primary_key=True)
-    file_id = Column(Integer)
-    group_id = Column(Integer)
+    file_id = Column(Integer, ForeignKey('files.id', ondelete='CASCADE'))
+    group_id = Column(Integer, ForeignKey('duplicate_groups.id', ondelete='CASCADE'))
     hash_value = Column(String(64), nullable=False)
     is_primary = Column(Boolean, default=False)  # Marked as keep
     is_deleted = Column(Boolean, default=False)
     
     # Indexes
     __table_args__ = (
-        Index('idx_file_id', 'file_id'),
-        Index('idx_group_id', 'group_id'),
+        # Both back ON DELETE CASCADE foreign keys; named like app.py's indexes on the same table
+        Index('idx_duplicate_files_file_id', 'file_id'),
+        Index('idx_duplicate_files_group_id', 'group_id'),
         Index('idx_hash', 'hash_value'),
     )
 
@@ -119,7 +133,7 @@ class StorageHistory(Base):
     
     id = Column(Integer, primary_key=True)
     date = Column(DateTime, nullable=False)
-    total_size = Column(Integer, nullable=False)  # Total size in bytes
+    total_size = Column(BigInteger, nullable=False)  # Total size in bytes
     file_count = Column(Integer, default=0)
     directory_count = Column(Integer, default=0)
     
@@ -134,7 +148,7 @@ class TrashBin(Base):
     
     id = Column(Integer, primary_key=True)
     original_path = Column(String(2000), nullable=False)
-    original_size = Column(Integer, nullable=False)
+    original_size = Column(BigInteger, nullable=False)
     deleted_time = Column(DateTime, default=datetime.utcnow)
     expires_at = Column(DateTime)  # When the file will be permanently deleted
     restored = Column(Boolean, default=False)
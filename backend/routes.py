@@ -1,14 +1,22 @@
 import os
+import json
+import base64
 import shutil
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 from flask import jsonify, request, send_file, current_app
-from sqlalchemy import func, desc, text
+from sqlalchemy import func, desc, text, tuple_
+from sqlalchemy.exc import OperationalError
 from scanner import FileScanner
 
 logger = logging.getLogger(__name__)
 
+# Health-check probe, built once rather than on every unlock request
+_PING = text("SELECT 1")
+
 # Initialize scanner
 scanner = FileScanner(
     data_path=os.environ.get('DATA_PATH', '/data'),
@@ -16,28 +24,99 @@ scanner = FileScanner(
 )
 
 # Utility functions
+SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+# Serialized listings format the same sizes over and over - memoize the string
+@lru_cache(maxsize=65536)
 def format_size(size_bytes):
     """Convert bytes to human readable format"""
     if size_bytes == 0:
         return "0 B"
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    return f"{size_bytes:.1f} {size_names[i]}"
+    # Each unit is 10 bits wide, so the unit index falls out of bit_length()
+    i = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(SIZE_NAMES) - 1)
+    return f"{size_bytes / (1 << (i * 10)):.1f} {SIZE_NAMES[i]}"
 
-def get_directory_size(path):
-    """Calculate total size of a directory"""
+# Largest page a client may ask for - bounds the rows serialized per request
+MAX_PER_PAGE = 200
+
+def get_per_page(default):
+    """Read per_page from the request, clamped to 1..MAX_PER_PAGE"""
+    return min(max(request.args.get('per_page', default, type=int), 1), MAX_PER_PAGE)
+
+def encode_cursor(sort_value, row_id):
+    """Encode the last row's (sort value, id) as an opaque keyset pagination cursor"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode()
+
+def decode_cursor(cursor, is_datetime=False):
+    """Decode a keyset pagination cursor back into (sort value, id)"""
+    sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if is_datetime and sort_value is not None:
+        sort_value = datetime.fromisoformat(sort_value)
+    return sort_value, row_id
+
+def serialize_file(file):
+    """Build the JSON representation of a FileRecord"""
+    return {
+        'id': file.id,
+        'path': file.path,
+        'name': file.name,
+        'size': file.size,
+        'size_formatted': format_size(file.size),
+        'is_directory': file.is_directory,
+        'extension': file.extension,
+        'modified_time': file.modified_time.isoformat() if file.modified_time else None,
+        'permissions': file.permissions
+    }
+
+def _scandir_size(path, allocated):
+    """Sum file sizes below path using cached DirEntry stat results"""
     total_size = 0
+    with os.scandir(path) as it:
+        for entry in it:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    total_size += _scandir_size(entry.path, allocated)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    total_size += stat.st_blocks * 512 if allocated else stat.st_size
+            except (OSError, PermissionError):
+                continue
+    return total_size
+
+def _safe_scandir_size(path, allocated):
+    """_scandir_size for one subtree, counting an unreadable subtree as 0"""
     try:
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.exists(filepath):
-                    total_size += os.path.getsize(filepath)
+        return _scandir_size(path, allocated)
     except (OSError, PermissionError):
-        pass
+        return 0
+
+def get_directory_size(path, allocated=True, max_workers=8):
+    """Calculate total size of a directory"""
+    # allocated=True sums on-disk blocks (st_blocks * 512) like du/unRAID report; False sums logical st_size
+    try:
+        total_size = 0
+        subdirs = []
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        total_size += stat.st_blocks * 512 if allocated else stat.st_size
+                except (OSError, PermissionError):
+                    continue
+    except (OSError, PermissionError):
+        return 0
+    
+    # Directory reads are latency-bound, so walk the top-level subtrees in parallel
+    if len(subdirs) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(subdirs))) as executor:
+            total_size += sum(executor.map(lambda subdir: _safe_scandir_size(subdir, allocated), subdirs))
+    elif subdirs:
+        total_size += _safe_scandir_size(subdirs[0], allocated)
     return total_size
 
 # API Routes
@@ -121,12 +200,17 @@ def register_routes(app):
             # Force engine cleanup
             db.engine.dispose()
             
-            # Wait a moment for cleanup
-            time.sleep(2)
-            
-            # Test if database is now accessible
-            db.session.execute(text("SELECT 1"))
-            db.session.commit()
+            # Test if database is now accessible - probe on a short-lived connection, not the session.
+            # Back off exponentially (about 1.6s in total) instead of always sleeping 2s first
+            for attempt in range(6):
+                try:
+                    with db.engine.connect() as conn:
+                        conn.execute(_PING)
+                    break
+                except OperationalError:
+                    if attempt == 5:
+                        raise
+                    time.sleep(0.05 * (2 ** attempt))
             
             logger.info("Database unlocked and tested successfully")
             return jsonify({'message': 'Database unlocked and tested successfully'})
@@ -149,7 +233,7 @@ def register_routes(app):
         """Get scan history"""
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 20, type=int)
+            per_page = get_per_page(20)
             
             scans = ScanRecord.query.order_by(desc(ScanRecord.start_time)).paginate(
                 page=page, per_page=per_page, error_out=False
@@ -179,12 +263,15 @@ def register_routes(app):
         """Get files with filtering and pagination"""
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 50, type=int)
+            per_page = get_per_page(50)
             search = request.args.get('search', '')
             path_filter = request.args.get('path', '')
             extension_filter = request.args.get('extension', '')
             sort_by = request.args.get('sort_by', 'name')
             sort_order = request.args.get('sort_order', 'asc')
+            cursor = request.args.get('cursor', '')
+            # OFFSET pages with total/pages stay the default, as in app.py - keyset is opt-in via mode or a cursor
+            mode = request.args.get('mode', 'keyset' if 'cursor' in request.args else 'offset')
             
             query = FileRecord.query
             
@@ -203,29 +290,51 @@ def register_routes(app):
                 order_col = FileRecord.modified_time
             else:
                 order_col = FileRecord.name
+            
+            # Page-number (OFFSET) pagination unless keyset was asked for
+            if mode != 'keyset':
+                if sort_order == 'desc':
+                    query = query.order_by(desc(order_col))
+                else:
+                    query = query.order_by(order_col)
                 
+                files = query.paginate(page=page, per_page=per_page, error_out=False)
+                
+                return jsonify({
+                    'files': [serialize_file(file) for file in files.items],
+                    'total': files.total,
+                    'pages': files.pages,
+                    'current_page': files.page
+                })
+            
+            # Keyset pagination - seek past the last row of the previous page on (sort column, id),
+            # so each page is an index range scan no matter how deep it is and no COUNT(*) is needed
+            if cursor:
+                try:
+                    cursor_value, cursor_id = decode_cursor(cursor, is_datetime=sort_by == 'modified')
+                except (ValueError, TypeError):
+                    return jsonify({'error': 'Invalid cursor'}), 400
+                if sort_order == 'desc':
+                    query = query.filter(tuple_(order_col, FileRecord.id) < (cursor_value, cursor_id))
+                else:
+                    query = query.filter(tuple_(order_col, FileRecord.id) > (cursor_value, cursor_id))
+            
             if sort_order == 'desc':
-                query = query.order_by(desc(order_col))
+                query = query.order_by(desc(order_col), desc(FileRecord.id))
             else:
-                query = query.order_by(order_col)
+                query = query.order_by(order_col, FileRecord.id)
             
-            files = query.paginate(page=page, per_page=per_page, error_out=False)
+            # Fetch one extra row to learn whether another page exists
+            rows = query.limit(per_page + 1).all()
+            next_cursor = None
+            if len(rows) > per_page:
+                rows = rows[:per_page]
+                last = rows[-1]
+                next_cursor = encode_cursor(getattr(last, order_col.key), last.id)
             
             return jsonify({
-                'files': [{
-                    'id': file.id,
-                    'path': file.path,
-                    'name': file.name,
-                    'size': file.size,
-                    'size_formatted': format_size(file.size),
-                    'is_directory': file.is_directory,
-                    'extension': file.extension,
-                    'modified_time': file.modified_time.isoformat() if file.modified_time else None,
-                    'permissions': file.permissions
-                } for file in files.items],
-                'total': files.total,
-                'pages': files.pages,
-                'current_page': files.page
+                'files': [serialize_file(file) for file in rows],
+                'next_cursor': next_cursor
             })
         except Exception as e:
             logger.error(f"Error getting files: {e}")
@@ -288,12 +397,13 @@ def register_routes(app):
         """Get media files with filtering"""
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 50, type=int)
+            per_page = get_per_page(50)
             media_type = request.args.get('type', '')
             resolution = request.args.get('resolution', '')
             search = request.args.get('search', '')
             
-            query = MediaFile.query.join(FileRecord)
+            # Pull the file size from the join that is already there instead of a lookup per media file
+            query = MediaFile.query.join(FileRecord).add_columns(FileRecord.size)
             
             # Apply filters
             if media_type:
@@ -315,9 +425,9 @@ def register_routes(app):
                     'video_codec': media.video_codec,
                     'audio_codec': media.audio_codec,
                     'runtime': media.runtime,
-                    'file_size': media.file_id and FileRecord.query.get(media.file_id).size or 0,
-                    'file_size_formatted': media.file_id and format_size(FileRecord.query.get(media.file_id).size) or '0 B'
-                } for media in media_files.items],
+                    'file_size': file_size or 0,
+                    'file_size_formatted': format_size(file_size or 0)
+                } for media, file_size in media_files.items],
                 'total': media_files.total,
                 'pages': media_files.pages,
                 'current_page': media_files.page
@@ -363,7 +473,7 @@ def register_routes(app):
         """Get trash bin contents"""
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 50, type=int)
+            per_page = get_per_page(50)
             
             trash_items = TrashBin.query.filter_by(restored=False).order_by(
                 desc(TrashBin.deleted_time)
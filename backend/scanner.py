@@ -3,7 +3,9 @@ import hashlib
 import logging
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import re
@@ -16,6 +18,9 @@ import re
 # from mutagen.mp3 import MP3
 # from mutagen.oggvorbis import OggVorbis
 
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
 from models import FileRecord, MediaFile, StorageHistory
 
 # Import db and models from Flask app - this should work within app context  
@@ -35,20 +40,150 @@ def get_setting(key, default=None):
 
 logger = logging.getLogger(__name__)
 
+# Problematic shares that are never scanned - matched as substrings of the lowercased share name
+EXCLUDED_SHARES = (
+    'cache', 'temp', 'tmp', 'logs', 'log', 'backup', 'backups',
+    'xteve', 'plex', 'emby', 'jellyfin', 'sonarr', 'radarr',
+    'lidarr', 'readarr', 'sabnzbd', 'nzbget', 'transmission',
+    'deluge', 'qbit', 'qbittorrent', 'docker', 'containers'
+)
+EXCLUDED_SHARES_RE = re.compile('|'.join(map(re.escape, EXCLUDED_SHARES)))
+
+APPDATA_RE = re.compile('appdata', re.IGNORECASE)
+
+def make_appdata_excluder(skip_appdata):
+    """Build the appdata name check once per scan, with the skip_appdata flag baked in"""
+    if not skip_appdata:
+        return lambda name: False
+    return lambda name: APPDATA_RE.search(name) is not None
+
+@lru_cache(maxsize=4096)
+def is_problematic_share(share_lower):
+    """Check a lowercased share name against EXCLUDED_SHARES (memoized)"""
+    return EXCLUDED_SHARES_RE.search(share_lower) is not None
+
+# Media filename patterns, compiled once - callers use pattern.search() directly instead of re.search(string)
+TV_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(.+?)[\.\s]S(\d{1,2})E(\d{1,2})',  # Show Name S01E01
+    r'(.+?)[\.\s](\d{1,2})x(\d{1,2})',   # Show Name 1x01
+    r'(.+?)[\.\s]Season[\.\s](\d{1,2})[\.\s]Episode[\.\s](\d{1,2})',  # Show Name Season 1 Episode 01
+))
+
+MOVIE_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(.+?)[\.\s]\((\d{4})\)',  # Movie Name (2023)
+    r'(.+?)[\.\s](\d{4})',      # Movie Name 2023
+))
+
+RESOLUTION_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'(\d{3,4})p',
+    r'(\d{3,4})i',
+    r'4K',
+    r'2160p',
+    r'1080p',
+    r'720p',
+    r'480p',
+))
+
+# Codecs are (name, pattern) pairs - the name is what gets stored, the pattern finds it case-insensitively
+VIDEO_CODEC_PATTERNS = tuple((codec, re.compile(re.escape(codec), re.IGNORECASE)) for codec in (
+    'H.264', 'H.265', 'HEVC', 'AVC', 'x264', 'x265', 'XviD', 'DivX',
+))
+
+AUDIO_CODEC_PATTERNS = tuple((codec, re.compile(re.escape(codec), re.IGNORECASE)) for codec in (
+    'AC3', 'AAC', 'DTS', 'FLAC', 'MP3', 'OGG', 'PCM',
+))
+
+SIZE_NAMES = ("B", "KB", "MB", "GB", "TB")
+
+def file_suffix(name):
+    """Lowercased extension of a file name by PurePath.suffix's rules, or None when it has none"""
+    i = name.rfind('.')
+    return name[i:].lower() if 0 < i < len(name) - 1 else None
+
+def iter_scandir(top):
+    """Walk top-down like os.walk, yielding (dirpath, dir_entries, file_entries) of os.DirEntry objects.
+    Prune the walk by editing dir_entries in place; unreadable directories are skipped"""
+    stack = [top]
+    while stack:
+        dirpath = stack.pop()
+        dir_entries = []
+        file_entries = []
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    # The entry type comes from the directory listing itself, no stat needed
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    (dir_entries if is_dir else file_entries).append(entry)
+        except OSError:
+            continue
+        
+        yield dirpath, dir_entries, file_entries
+        
+        # Like os.walk, list symlinked directories but don't descend into them.
+        # Pushed in reverse so subdirectories are visited in listing order
+        for entry in reversed(dir_entries):
+            if not entry.is_symlink():
+                stack.append(entry.path)
+
+# Stats of large directories are issued from a small thread pool - stat() releases the GIL, so a slow
+# disk gets several requests in flight instead of one at a time. DirEntry caches each result
+STAT_PREFETCH_MIN = 64  # directories with fewer files are stat'ed inline
+stat_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='scan-stat')
+
+def _prefetch_stat(entry):
+    """Fill entry's cached stat(); errors surface again when the scan reads it"""
+    try:
+        entry.stat()
+    except OSError:
+        pass
+
+def prefetch_stats(entries):
+    """Warm the cached stat() of every entry in parallel"""
+    for _ in stat_executor.map(_prefetch_stat, entries):
+        pass
+
+# Scanned entries are written as plain row dicts through executemany Core inserts instead of one ORM object each.
+# File ids come back through RETURNING in parameter order, so each media row is linked to its file
+DIR_INSERT = insert(FileRecord.__table__)
+FILE_INSERT = insert(FileRecord.__table__).returning(FileRecord.__table__.c.id, sort_by_parameter_order=True)
+MEDIA_INSERT = insert(MediaFile.__table__)
+
+def insert_scan_rows(dir_rows, file_rows, media_rows):
+    """Bulk insert the buffered directory, file and media rows, then clear the buffers"""
+    if dir_rows:
+        db.session.execute(DIR_INSERT, dir_rows)
+    if file_rows:
+        file_ids = db.session.execute(FILE_INSERT, file_rows).scalars().all()
+        linked = [dict(media, file_id=file_id) for media, file_id in zip(media_rows, file_ids) if media is not None]
+        if linked:
+            db.session.execute(MEDIA_INSERT, linked)
+    dir_rows.clear()
+    file_rows.clear()
+    media_rows.clear()
+
+FOLDER_INFO_BATCH = 1000  # directories per FolderInfo insert and commit
+
 def format_size(size_bytes):
     """Convert bytes to human readable format"""
     if size_bytes == 0:
         return "0 B"
-    size_names = ["B", "KB", "MB", "GB", "TB"]
-    i = 0
-    while size_bytes >= 1024 and i < len(size_names) - 1:
-        size_bytes /= 1024.0
-        i += 1
-    return f"{size_bytes:.1f} {size_names[i]}"
+    # Each unit is 10 bits wide, so the unit index falls out of bit_length()
+    i = min((max(int(size_bytes), 1).bit_length() - 1) // 10, len(SIZE_NAMES) - 1)
+    return f"{size_bytes / (1 << (i * 10)):.1f} {SIZE_NAMES[i]}"
 
 class FileScanner:
     """Efficient file system scanner for unRAID storage analysis"""
     
+    # Filename patterns, compiled once at import (see the module-level tuples)
+    tv_patterns = TV_PATTERNS
+    movie_patterns = MOVIE_PATTERNS
+    resolution_patterns = RESOLUTION_PATTERNS
+    video_codec_patterns = VIDEO_CODEC_PATTERNS
+    audio_codec_patterns = AUDIO_CODEC_PATTERNS
+    
     def __init__(self, data_path: str = "/data", max_duration: int = 6):
         self.data_path = Path(data_path)
         self.max_duration = max_duration * 3600  # Convert to seconds
@@ -62,52 +197,6 @@ class FileScanner:
         self.video_extensions = {'.mkv', '.mp4', '.avi', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.ts', '.mts'}
         self.audio_extensions = {'.mp3', '.flac', '.wav', '.aac', '.ogg', '.m4a', '.wma'}
         self.image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp'}
-        
-        # TV Show patterns
-        self.tv_patterns = [
-            r'(.+?)[\.\s]S(\d{1,2})E(\d{1,2})',  # Show Name S01E01
-            r'(.+?)[\.\s](\d{1,2})x(\d{1,2})',   # Show Name 1x01
-            r'(.+?)[\.\s]Season[\.\s](\d{1,2})[\.\s]Episode[\.\s](\d{1,2})',  # Show Name Season 1 Episode 01
-        ]
-        
-        # Movie patterns
-        self.movie_patterns = [
-            r'(.+?)[\.\s]\((\d{4})\)',  # Movie Name (2023)
-            r'(.+?)[\.\s](\d{4})',      # Movie Name 2023
-        ]
-        
-        # Resolution patterns
-        self.resolution_patterns = [
-            r'(\d{3,4})p',
-            r'(\d{3,4})i',
-            r'4K',
-            r'2160p',
-            r'1080p',
-            r'720p',
-            r'480p',
-        ]
-        
-        # Codec patterns
-        self.video_codec_patterns = [
-            r'H\.264',
-            r'H\.265',
-            r'HEVC',
-            r'AVC',
-            r'x264',
-            r'x265',
-            r'XviD',
-            r'DivX',
-        ]
-        
-        self.audio_codec_patterns = [
-            r'AC3',
-            r'AAC',
-            r'DTS',
-            r'FLAC',
-            r'MP3',
-            r'OGG',
-            r'PCM',
-        ]
 
     def start_scan(self) -> int:
         """Start a new scan session"""
@@ -123,24 +212,26 @@ class FileScanner:
                 current_app.extensions['sqlalchemy']
                 # We have Flask context, proceed normally
                 from app import ScanRecord
-                running_scans = db.session.query(ScanRecord).filter_by(status='running').all()
-                for scan in running_scans:
-                    scan.status = 'failed'
-                    scan.error_message = 'Superseded by new scan'
-                    scan.end_time = datetime.utcnow()
+                # Single bulk UPDATE instead of loading and flushing each row
+                failed_count = db.session.query(ScanRecord).filter_by(status='running').update({
+                    'status': 'failed',
+                    'error_message': 'Superseded by new scan',
+                    'end_time': datetime.utcnow()
+                }, synchronize_session=False)
                 db.session.commit()
-                logger.info(f"Marked {len(running_scans)} existing running scans as failed")
+                logger.info(f"Marked {failed_count} existing running scans as failed")
             except RuntimeError:
                 # No Flask context, create one
                 from app import app, ScanRecord
                 with app.app_context():
-                    running_scans = db.session.query(ScanRecord).filter_by(status='running').all()
-                    for scan in running_scans:
-                        scan.status = 'failed'
-                        scan.error_message = 'Superseded by new scan'
-                        scan.end_time = datetime.utcnow()
+                    # Single bulk UPDATE instead of loading and flushing each row
+                    failed_count = db.session.query(ScanRecord).filter_by(status='running').update({
+                        'status': 'failed',
+                        'error_message': 'Superseded by new scan',
+                        'end_time': datetime.utcnow()
+                    }, synchronize_session=False)
                     db.session.commit()
-                    logger.info(f"Marked {len(running_scans)} existing running scans as failed")
+                    logger.info(f"Marked {failed_count} existing running scans as failed")
         except Exception as e:
             logger.error(f"Error cleaning up old scans: {e}")
         
@@ -230,13 +321,14 @@ class FileScanner:
         for attempt in range(max_retries):
             try:
                 from app import ScanRecord
-                running_scans = db.session.query(ScanRecord).filter_by(status='running').all()
-                for scan in running_scans:
-                    scan.status = 'failed'
-                    scan.error_message = 'Force reset by user'
-                    scan.end_time = datetime.utcnow()
+                # Single bulk UPDATE instead of loading and flushing each row
+                failed_count = db.session.query(ScanRecord).filter_by(status='running').update({
+                    'status': 'failed',
+                    'error_message': 'Force reset by user',
+                    'end_time': datetime.utcnow()
+                }, synchronize_session=False)
                 db.session.commit()
-                logger.info(f"Force reset {len(running_scans)} running scans in database")
+                logger.info(f"Force reset {failed_count} running scans in database")
                 break
             except Exception as e:
                 logger.warning(f"Database reset attempt {attempt + 1} failed: {e}")
@@ -439,36 +531,84 @@ class FileScanner:
             total_size = 0
             last_update_time = time.time()
             
+            # Per-entry errors are sampled - log the first 100, then every 10,000th
+            entry_errors = 0
+            error_log_limit = 100
+            error_log_every = 10000
+            
             # Store progress in instance variables for real-time access
             self._total_files = 0
             self._total_directories = 0
             self._total_size = 0
             
+            # Rows waiting for the next bulk insert - media_rows runs parallel to file_rows
+            dir_rows = []
+            file_rows = []
+            media_rows = []
+            
+            def flush_rows():
+                """Insert and commit the buffered rows; a failed batch is retried row by row"""
+                nonlocal total_files, total_directories, total_size, entry_errors
+                try:
+                    insert_scan_rows(dir_rows, file_rows, media_rows)
+                    db.session.commit()
+                    return
+                except Exception as e:
+                    logger.error(f"Error inserting {len(dir_rows) + len(file_rows):,} scanned entries, retrying one at a time: {e}")
+                    db.session.rollback()
+                
+                # Keep every row that inserts on its own; the ones that still fail come off the totals.
+                # Only a constraint error is specific to one row - anything else (a locked or full
+                # database) would fail every retry too, so the rest of the batch is dropped with it
+                batch = [([row], [], []) for row in dir_rows] + [([], [row], [media]) for row, media in zip(file_rows, media_rows)]
+                dir_rows.clear()
+                file_rows.clear()
+                media_rows.clear()
+                retry = True
+                for one_dir, one_file, one_media in batch:
+                    row = (one_dir or one_file)[0]
+                    if retry:
+                        try:
+                            insert_scan_rows(one_dir, one_file, one_media)
+                            db.session.commit()
+                            continue
+                        except Exception as e:
+                            db.session.rollback()
+                            retry = isinstance(e, IntegrityError)
+                            entry_errors += 1
+                            if entry_errors <= error_log_limit or entry_errors % error_log_every == 0:
+                                logger.error(f"Error inserting {row['path']}: {e} ({entry_errors:,} entry errors so far)")
+                    else:
+                        entry_errors += 1
+                    if one_dir:
+                        total_directories -= 1
+                    else:
+                        total_files -= 1
+                        total_size -= row['size']
+                self._total_files = total_files
+                self._total_directories = total_directories
+                self._total_size = total_size
+            
             # Get max shares to scan setting
     
             
+            # Read skip_appdata once per scan - it was re-queried for every share and every walked directory
+            skip_appdata = get_setting('skip_appdata', 'true').lower() == 'true'
+            is_appdata_name = make_appdata_excluder(skip_appdata)
+            
             def is_excluded_share(share_name):
                 """Check if a share should be excluded"""
                 share_lower = share_name.lower()
                 
                 # Check skip_appdata setting
-                skip_appdata = get_setting('skip_appdata', 'true').lower() == 'true'
-                if skip_appdata and ('appdata' in share_lower or share_lower == 'appdata'):
+                if is_appdata_name(share_name):
                     logger.info(f"Excluding appdata share: {share_name} (skip_appdata setting enabled)")
                     return True
                 
-                # Also exclude other problematic shares
-                excluded_shares = [
-                    'cache', 'temp', 'tmp', 'logs', 'log', 'backup', 'backups',
-                    'xteve', 'plex', 'emby', 'jellyfin', 'sonarr', 'radarr', 
-                    'lidarr', 'readarr', 'sabnzbd', 'nzbget', 'transmission', 
-                    'deluge', 'qbit', 'qbittorrent', 'docker', 'containers'
-                ]
-                
-                for excluded in excluded_shares:
-                    if excluded in share_lower:
-                        logger.info(f"EXCLUDING problematic share: {share_name}")
-                        return True
+                # Also exclude other problematic shares - one regex scan instead of a substring test per pattern
+                if is_problematic_share(share_lower):
+                    logger.info(f"EXCLUDING problematic share: {share_name}")
+                    return True
                 
                 return False
             
@@ -545,39 +685,37 @@ class FileScanner:
                         continue
                     
                     # Create record for the share directory (e.g., /data/tv shows)
-                    share_record = FileRecord(
-                        path=share_path,
-                        name=share_name,
-                        size=0,
-                        is_directory=True,
-                        parent_path=str(self.data_path),  # parent is /data
-                        scan_id=self.current_scan_id
-                    )
-                    db.session.add(share_record)
+                    dir_rows.append({
+                        'path': share_path,
+                        'name': share_name,
+                        'size': 0,
+                        'is_directory': True,
+                        'parent_path': str(self.data_path),  # parent is /data
+                        'scan_id': self.current_scan_id,
+                    })
                     total_directories += 1
                     self._total_directories = total_directories
                     logger.info(f"Created top-level share record: {share_path} (parent: {self.data_path})")
                     
                 except Exception as e:
                     logger.error(f"Error creating share directory record for {share_path}: {e}")
-                    db.session.rollback()
                     continue
                 
                 # Now scan this share recursively
                 try:
-                    for root, dirs, files in os.walk(share_path):
+                    for root, dirs, files in iter_scandir(share_path):
                         if self.stop_scan:
                             logger.info("Scan stopped by user request")
                             break
                         
                         # Check skip_appdata setting for directory filtering
-                        skip_appdata = get_setting('skip_appdata', 'true').lower() == 'true'
                         if skip_appdata:
-                            # Filter out appdata directories from dirs list
-                            original_dirs = dirs.copy()
-                            dirs[:] = [d for d in dirs if 'appdata' not in d.lower()]
-                            if len(original_dirs) != len(dirs):
-                                logger.info(f"Filtered out {len(original_dirs) - len(dirs)} appdata directories from {root} (skip_appdata setting enabled)")
+                            # Filter out appdata directories from dirs list - only the entry names are tested,
+                            # root itself was already cleared when its parent was filtered
+                            kept_dirs = [d for d in dirs if not is_appdata_name(d.name)]
+                            if len(kept_dirs) != len(dirs):
+                                logger.info(f"Filtered out {len(dirs) - len(kept_dirs)} appdata directories from {root} (skip_appdata setting enabled)")
+                                dirs[:] = kept_dirs
                         
                         # Check for directory timeout
                         current_time = time.time()
@@ -597,7 +735,8 @@ class FileScanner:
                         if last_path != root:
                             last_path = root
                             last_path_change = current_time
-                            logger.info(f"Processing directory: {root}")
+                            # Per-directory line is DEBUG and lazily formatted - this runs once per walked directory
+                            logger.debug("Processing directory: %s", root)
                             
                             # Log progress every 500 directories
                             if total_directories % 500 == 0:
@@ -627,11 +766,12 @@ class FileScanner:
                             continue
                         
                         # Process directories first
-                        for dir_name in dirs:
+                        for dir_entry in dirs:
                              if self.stop_scan:
                                  break
                              
-                             dir_path = os.path.join(root, dir_name)
+                             dir_name = dir_entry.name
+                             dir_path = dir_entry.path
                              
                              try:
                                  # Ensure we have a scan record
@@ -639,35 +779,40 @@ class FileScanner:
                                      logger.error(f"🚨 CRITICAL: current_scan_id is None during directory processing: {dir_path}")
                                      continue
                                 
-                                 # Create directory record using FileRecord with is_directory=True
-                                 dir_record = FileRecord(
-                                     path=dir_path,
-                                     name=dir_name,
-                                     size=0,
-                                     is_directory=True,
-                                     parent_path=root,
-                                     scan_id=self.current_scan_id
-                                 )
-                                 db.session.add(dir_record)
+                                 # Buffer the directory row (a files row with is_directory=True)
+                                 dir_rows.append({
+                                     'path': dir_path,
+                                     'name': dir_name,
+                                     'size': 0,
+                                     'is_directory': True,
+                                     'parent_path': root,
+                                     'scan_id': self.current_scan_id,
+                                 })
                                  total_directories += 1
                                  self._total_directories = total_directories
                                 
                                  # Commit every 100 directories to prevent memory buildup
                                  if total_directories % 100 == 0:
-                                     db.session.commit()
-                                     logger.debug(f"Committed {total_directories} directories")
+                                     flush_rows()
+                                     logger.debug("Committed %d directories", total_directories)
                                      
                              except Exception as e:
-                                 logger.error(f"Error processing directory {dir_path}: {e}")
-                                 db.session.rollback()
+                                 entry_errors += 1
+                                 if entry_errors <= error_log_limit or entry_errors % error_log_every == 0:
+                                     logger.error(f"Error processing directory {dir_path}: {e} ({entry_errors:,} entry errors so far)")
                                  continue
                         
-                        # Process files
-                        for file_name in files:
+                        # Process files - a big directory's stats are fetched concurrently first,
+                        # so file_entry.stat() below reads the cached result without another syscall
+                        if len(files) >= STAT_PREFETCH_MIN:
+                            prefetch_stats(files)
+                        
+                        for file_entry in files:
                             if self.stop_scan:
                                 break
                             
-                            file_path = os.path.join(root, file_name)
+                            file_name = file_entry.name
+                            file_path = file_entry.path
                             
                             try:
                                 # Ensure we have a scan record
@@ -675,27 +820,23 @@ class FileScanner:
                                     logger.error(f"🚨 CRITICAL: current_scan_id is None during file processing: {file_path}")
                                     continue
                                 
-                                # Get file stats
-                                stat = os.stat(file_path)
+                                # Get file stats - from the entry, following symlinks like os.stat
+                                stat = file_entry.stat()
                                 file_size = stat.st_size
                                 
-                                # Extract file extension
-                                file_extension = Path(file_path).suffix.lower() if Path(file_path).suffix else None
-                                
-                                # Create file record
-                                file_record = FileRecord(
-                                    path=file_path,
-                                    name=file_name,
-                                    size=file_size,
-                                    extension=file_extension,
-                                    parent_path=root,
-                                    scan_id=self.current_scan_id
-                                )
+                                # Extract file extension - from the name, without building Path objects
+                                file_extension = file_suffix(file_name)
                                 
-                                # Extract media metadata if applicable
-                                self._extract_media_metadata(file_record, Path(file_path))
-                                
-                                db.session.add(file_record)
+                                # Buffer the file row, with its media metadata alongside
+                                file_rows.append({
+                                    'path': file_path,
+                                    'name': file_name,
+                                    'size': file_size,
+                                    'extension': file_extension,
+                                    'parent_path': root,
+                                    'scan_id': self.current_scan_id,
+                                })
+                                media_rows.append(self._extract_media_metadata(file_name, file_extension))
                                 total_files += 1
                                 total_size += file_size
                                 self._total_files = total_files
@@ -703,12 +844,13 @@ class FileScanner:
                                 
                                 # Commit every 1000 files to prevent memory buildup
                                 if total_files % 1000 == 0:
-                                    db.session.commit()
-                                    logger.debug(f"Committed {total_files} files")
+                                    flush_rows()
+                                    logger.debug("Committed %d files", total_files)
                                     
                             except Exception as e:
-                                logger.error(f"Error processing file {file_path}: {e}")
-                                db.session.rollback()
+                                entry_errors += 1
+                                if entry_errors <= error_log_limit or entry_errors % error_log_every == 0:
+                                    logger.error(f"Error processing file {file_path}: {e} ({entry_errors:,} entry errors so far)")
                                 continue
                         
                         # Update progress in database periodically
@@ -733,7 +875,8 @@ class FileScanner:
                                 self.update_scanner_state(total_files, total_directories, total_size, share_path)
                                 
                                 last_update_time = current_time
-                                logger.debug(f"Updated scan progress: {total_files} files, {total_directories} dirs, {format_size(total_size)}")
+                                if logger.isEnabledFor(logging.DEBUG):
+                                    logger.debug("Updated scan progress: %d files, %d dirs, %s", total_files, total_directories, format_size(total_size))
                             except Exception as e:
                                 logger.error(f"Error updating scan progress: {e}")
                                 db.session.rollback()
@@ -757,6 +900,12 @@ class FileScanner:
                     logger.error(f"Error scanning share {share_name}: {e}")
                     continue
             
+            # Insert whatever is still buffered from the last batch
+            flush_rows()
+            
+            if entry_errors:
+                logger.warning(f"{entry_errors:,} files/directories could not be processed during the scan")
+            
             # Final commit with Flask context protection
             try:
                 # Ensure we have a scan record first
@@ -884,12 +1033,15 @@ class FileScanner:
             
             logger.info("Scan state cleaned up")
 
-    def _extract_media_metadata(self, file_record: FileRecord, file_path: Path):
-        """Extract metadata from media files"""
+    def _extract_media_metadata(self, file_name: str, extension: str) -> Optional[Dict]:
+        """Extract metadata from media files as a media_files row without file_id"""
         try:
-            # Determine media type and extract basic info
-            extension = file_path.suffix.lower()
-            filename = file_path.stem
+            # Determine media type and extract basic info - the stem is the name minus its suffix, as Path.stem.
+            # file_suffix gives None for a name without an extension, whose stem is then the whole name
+            if extension is None:
+                filename = file_name
+            else:
+                filename = file_name[:len(file_name) - len(extension)]
             
             media_type = 'other'
             title = None
@@ -903,7 +1055,7 @@ class FileScanner:
             
             # Check if it's a TV show
             for pattern in self.tv_patterns:
-                match = re.search(pattern, filename, re.IGNORECASE)
+                match = pattern.search(filename)
                 if match:
                     media_type = 'tv_show'
                     title = match.group(1).strip()
@@ -914,7 +1066,7 @@ class FileScanner:
             # Check if it's a movie
             if media_type == 'other':
                 for pattern in self.movie_patterns:
-                    match = re.search(pattern, filename, re.IGNORECASE)
+                    match = pattern.search(filename)
                     if match:
                         media_type = 'movie'
                         title = match.group(1).strip()
@@ -923,39 +1075,38 @@ class FileScanner:
             
             # Extract resolution and codec info from filename
             for pattern in self.resolution_patterns:
-                match = re.search(pattern, filename, re.IGNORECASE)
+                match = pattern.search(filename)
                 if match:
                     resolution = match.group(0)
                     break
             
-            for pattern in self.video_codec_patterns:
-                if pattern.lower() in filename.lower():
-                    video_codec = pattern
+            for codec, pattern in self.video_codec_patterns:
+                if pattern.search(filename):
+                    video_codec = codec
                     break
             
-            for pattern in self.audio_codec_patterns:
-                if pattern.lower() in filename.lower():
-                    audio_codec = pattern
+            for codec, pattern in self.audio_codec_patterns:
+                if pattern.search(filename):
+                    audio_codec = codec
                     break
             
-            # Create media file record
-            media_record = MediaFile(
-                file_id=file_record.id,
-                media_type=media_type,
-                title=title,
-                year=year,
-                season=season,
-                episode=episode,
-                resolution=resolution,
-                video_codec=video_codec,
-                audio_codec=audio_codec,
-                runtime=runtime,
-                file_format=extension[1:] if extension else None
-            )
-            db.session.add(media_record)
+            # Media file row - file_id is filled in once the file row is inserted
+            return {
+                'media_type': media_type,
+                'title': title,
+                'year': year,
+                'season': season,
+                'episode': episode,
+                'resolution': resolution,
+                'video_codec': video_codec,
+                'audio_codec': audio_codec,
+                'runtime': runtime,
+                'file_format': extension[1:] if extension else None,
+            }
             
         except Exception as e:
-            logger.debug(f"Error extracting metadata from {file_path}: {e}")
+            logger.debug(f"Error extracting metadata from {file_name}: {e}")
+            return None
 
     def _record_storage_history(self, total_size: int, total_files: int, total_directories: int):
         """Record storage usage for historical tracking"""
@@ -1024,6 +1175,21 @@ class FileScanner:
                 logger.error(f"Error detecting duplicates: {e}")
                 logger.warning("Continuing scan without duplicate detection...")
             
+            # Save per-scan statistics for analytics
+            logger.info("Saving scan statistics...")
+            try:
+                from app import save_scan_statistics
+                save_scan_statistics(self.current_scan_id)
+                logger.info("Scan statistics saved")
+            except Exception as e:
+                logger.error(f"Error saving scan statistics: {e}")
+                logger.warning("Continuing scan without scan statistics...")
+            
+            # Rebuild the search index once for the finished scan - not per row during the walk
+            logger.info("Rebuilding search index...")
+            from app import rebuild_search_index
+            rebuild_search_index(self.current_scan_id)
+            
             # Save storage history
             logger.info("Saving storage history...")
             try:
@@ -1042,7 +1208,7 @@ class FileScanner:
     def _create_folder_info_records(self):
         """Create FolderInfo records for directories to support top shares and file tree"""
         try:
-            from app import FolderInfo
+            from app import FolderInfo, path_under
             from models import FileRecord
             from sqlalchemy import func
             
@@ -1051,67 +1217,80 @@ class FileScanner:
             # Clear existing FolderInfo records for this scan
             db.session.query(FolderInfo).filter_by(scan_id=self.current_scan_id).delete()
             
-            # Get all directories from this scan
-            directories = db.session.query(FileRecord).filter_by(
+            # Directories of this scan are read by id in keyset batches, and each batch's FolderInfo rows are
+            # inserted and committed before the next one, so neither side grows with the number of directories
+            directories_query = db.session.query(
+                FileRecord.id, FileRecord.path, FileRecord.name, FileRecord.parent_path
+            ).filter_by(
                 scan_id=self.current_scan_id,
                 is_directory=True
-            ).all()
+            )
+            directory_count = directories_query.count()
             
-            logger.info(f"Processing {len(directories)} directories for FolderInfo creation...")
+            logger.info(f"Processing {directory_count} directories for FolderInfo creation...")
             
-            for directory in directories:
-                try:
-                    # Calculate directory depth  
-                    depth = directory.path.count('/') - str(self.data_path).count('/')
-                    
-                    # Debug logging for depth calculation
-                    if depth == 1:
-                        logger.info(f"TOP-LEVEL DIRECTORY: {directory.path} (depth={depth})")
-                    
-                    # Get total size and file counts for this directory (including subdirectories)
-                    result = db.session.query(
-                        func.sum(FileRecord.size).label('total_size'),
-                        func.count(FileRecord.id).label('total_count'),
-                        func.sum(func.case([(FileRecord.is_directory == False, 1)], else_=0)).label('file_count'),
-                        func.sum(func.case([(FileRecord.is_directory == True, 1)], else_=0)).label('directory_count')
-                    ).filter(
-                        FileRecord.path.like(f"{directory.path}/%"),
-                        FileRecord.scan_id == self.current_scan_id
-                    ).first()
-                    
-                    # Get direct children counts
-                    direct_result = db.session.query(
-                        func.count(func.case([(FileRecord.is_directory == False, 1)], else_=0)).label('direct_files'),
-                        func.count(func.case([(FileRecord.is_directory == True, 1)], else_=0)).label('direct_dirs')
-                    ).filter(
-                        FileRecord.parent_path == directory.path,
-                        FileRecord.scan_id == self.current_scan_id
-                    ).first()
-                    
-                    # Create FolderInfo record
-                    folder_info = FolderInfo(
-                        path=directory.path,
-                        name=directory.name,
-                        parent_path=directory.parent_path,
-                        total_size=result.total_size or 0,
-                        file_count=result.file_count or 0,
-                        directory_count=result.directory_count or 0,
-                        direct_file_count=direct_result.direct_files or 0,
-                        direct_directory_count=direct_result.direct_dirs or 0,
-                        depth=depth,
-                        scan_id=self.current_scan_id,
-                        updated_at=datetime.utcnow()
-                    )
-                    
-                    db.session.add(folder_info)
-                    
-                except Exception as e:
-                    logger.error(f"Error creating FolderInfo for {directory.path}: {e}")
-                    continue
+            last_id = 0
+            while True:
+                directories = directories_query.filter(FileRecord.id > last_id).order_by(FileRecord.id).limit(FOLDER_INFO_BATCH).all()
+                if not directories:
+                    break
+                last_id = directories[-1].id
+                folder_rows = []
+                
+                for directory in directories:
+                    try:
+                        # Calculate directory depth  
+                        depth = directory.path.count('/') - str(self.data_path).count('/')
+                        
+                        # Debug logging for depth calculation
+                        if depth == 1:
+                            logger.info(f"TOP-LEVEL DIRECTORY: {directory.path} (depth={depth})")
+                        
+                        # Get total size and file counts for this directory (including subdirectories)
+                        result = db.session.query(
+                            func.sum(FileRecord.size).label('total_size'),
+                            func.count(FileRecord.id).label('total_count'),
+                            func.sum(func.case([(FileRecord.is_directory == False, 1)], else_=0)).label('file_count'),
+                            func.sum(func.case([(FileRecord.is_directory == True, 1)], else_=0)).label('directory_count')
+                        ).filter(
+                            path_under(FileRecord.path, directory.path),
+                            FileRecord.scan_id == self.current_scan_id
+                        ).first()
+                        
+                        # Get direct children counts
+                        direct_result = db.session.query(
+                            func.count(func.case([(FileRecord.is_directory == False, 1)], else_=0)).label('direct_files'),
+                            func.count(func.case([(FileRecord.is_directory == True, 1)], else_=0)).label('direct_dirs')
+                        ).filter(
+                            FileRecord.parent_path == directory.path,
+                            FileRecord.scan_id == self.current_scan_id
+                        ).first()
+                        
+                        # Buffer the FolderInfo row
+                        folder_rows.append({
+                            'path': directory.path,
+                            'name': directory.name,
+                            'parent_path': directory.parent_path,
+                            'total_size': result.total_size or 0,
+                            'file_count': result.file_count or 0,
+                            'directory_count': result.directory_count or 0,
+                            'direct_file_count': direct_result.direct_files or 0,
+                            'direct_directory_count': direct_result.direct_dirs or 0,
+                            'depth': depth,
+                            'scan_id': self.current_scan_id,
+                            'updated_at': datetime.utcnow(),
+                        })
+                        
+                    except Exception as e:
+                        logger.error(f"Error creating FolderInfo for {directory.path}: {e}")
+                        continue
+                
+                # Insert and commit this batch's FolderInfo rows
+                if folder_rows:
+                    db.session.execute(insert(FolderInfo.__table__), folder_rows)
+                db.session.commit()
             
-            # Commit all FolderInfo records
-            db.session.commit()
-            logger.info(f"Successfully created FolderInfo records for {len(directories)} directories")
+            logger.info(f"Successfully created FolderInfo records for {directory_count} directories")
             
         except Exception as e:
             logger.error(f"Error in _create_folder_info_records: {e}")
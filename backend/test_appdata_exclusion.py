@@ -4,32 +4,38 @@ Test script to verify appdata exclusion is working properly
 """
 
 import os
+import re
 import sys
 from pathlib import Path
 
+# Problematic directories that might cause delays
+PROBLEMATIC_PATTERNS = (
+    'cache', 'temp', 'tmp', 'logs', 'log', 'backup', 'backups',
+    'xteve', 'plex', 'emby', 'jellyfin', 'sonarr', 'radarr', 
+    'lidarr', 'readarr', 'sabnzbd', 'nzbget', 'transmission', 
+    'deluge', 'qbit', 'qbittorrent', 'docker', 'containers'
+)
+# appdata and the problematic names fused into one alternation - a single case-insensitive pass per path
+EXCLUDED_RE = re.compile(
+    '(?P<appdata>appdata)|(?P<problematic>' + '|'.join(map(re.escape, PROBLEMATIC_PATTERNS)) + ')',
+    re.IGNORECASE
+)
+APPDATA_RE = re.compile('appdata', re.IGNORECASE)
+
 def is_appdata_path(path_str):
     """Simple check if path contains appdata - EXTREMELY AGGRESSIVE"""
-    path_lower = path_str.lower()
+    # Check for ANY occurrence of appdata, or of another problematic directory name, in the path
+    match = EXCLUDED_RE.search(path_str)
+    if match is None:
+        return False
     
-    # Check for ANY occurrence of appdata in the path
-    if 'appdata' in path_lower:
+    # A problematic name left of appdata matches first - look past it, since appdata is reported
+    # ahead of the problematic names as before (/mnt/cache/appdata is an appdata path)
+    if match.lastgroup == 'appdata' or APPDATA_RE.search(path_str, match.start() + 1):
         print(f"EXCLUDING appdata path: {path_str}")
-        return True
-    
-    # Also exclude other problematic directories that might cause delays
-    problematic_patterns = [
-        'cache', 'temp', 'tmp', 'logs', 'log', 'backup', 'backups',
-        'xteve', 'plex', 'emby', 'jellyfin', 'sonarr', 'radarr', 
-        'lidarr', 'readarr', 'sabnzbd', 'nzbget', 'transmission', 
-        'deluge', 'qbit', 'qbittorrent', 'docker', 'containers'
-    ]
-    
-    for pattern in problematic_patterns:
-        if pattern in path_lower:
-            print(f"EXCLUDING problematic directory: {path_str}")
-            return True
-    
-    return False
+    else:
+        print(f"EXCLUDING problematic directory: {path_str}")
+    return True
 
 def test_appdata_exclusion():
     """Test the appdata exclusion function with various paths"""